@@ -2,20 +2,45 @@ import os
 import random
 import logging
 import json
+import base64
+import hashlib
 import shutil
-from datetime import datetime, timedelta, timezone
-import requests
+import time
+import threading
+import functools
+import contextlib
+import hmac
+import math
+import mimetypes
+from urllib.parse import quote
+from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import click
 
-from flask import Flask, render_template, request, jsonify, url_for, session, redirect, flash, send_from_directory
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, jsonify, url_for, session, redirect, flash, stream_with_context, abort, g, has_request_context
+from werkzeug.utils import secure_filename, safe_join, send_file as werkzeug_send_file
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
-from flask_mail import Mail, Message
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_migrate import Migrate
+from sqlalchemy import event, inspect
 
-from download_model import create_enhanced_chatbot
+from response_cache import create_response_cache
+from llm_guard import LLMGuard, CircuitBreaker
+from swr_cache import StaleWhileRevalidateCache
+from rate_limit import create_rate_limiter, parse_rules
+from page_cache import PageCache
+from content_cache import VersionedContentCache
+from event_sink import BufferedEventSink
+from blob_store import BlobStore
+from export_stream import EXPORT_FORMATS, encode_rows
+from serializers import build_serializers, format_day, format_minutes
+from metrics import COUNT_BUCKETS, MetricsRegistry, RequestTimings, SlowRequestProfiler
+from event_archive import day_parts, write_part, iter_archived, archived_days, parse_timestamp
+from zip_stream import iter_zip
+from mail_attachments import ATTACHMENTS_NOTE, attachments_note, plan_attachments, needs_streaming, download_links_html, download_links_text, iter_mime_message, send_streamed
 
 # --- Load Environment Variables ---
 load_dotenv()
@@ -24,11 +49,27 @@ load_dotenv()
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'a_very_secret_key_for_dev_only')
 
+# --- Configure Reverse Proxies ---
+# Number of proxies in front of the app (Render's router, nginx, ...) whose X-Forwarded-For/-Proto entries are
+# trusted. Only those rightmost entries are used for request.remote_addr: anything further left was written by
+# the client. Leave at 0 when clients reach the app directly, or every visitor can pick the IP they are logged,
+# and rate limited, under. gunicorn.conf.py defaults it to 1 for the production deploy behind Render's router.
+app.config['TRUSTED_PROXY_HOPS'] = int(os.getenv('TRUSTED_PROXY_HOPS', 0))
+if app.config['TRUSTED_PROXY_HOPS'] > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'], x_proto=app.config['TRUSTED_PROXY_HOPS'])
+
 # --- Configure File Uploads ---
 UPLOAD_FOLDER = os.path.join(app.instance_path, 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Uploaded documents are stored once per unique content under uploads/blobs and referenced by ApplicationFile rows.
+BLOB_SUBDIR = 'blobs'
+blob_store = BlobStore(os.path.join(UPLOAD_FOLDER, BLOB_SUBDIR))
 app.config['MAX_CONTENT_LENGTH'] = 25 * 1024 * 1024
+# 'x-accel' (nginx) or 'x-sendfile' (Apache, lighttpd) lets the front proxy send download bodies; empty serves them from Python.
+# For nginx, DOWNLOAD_ACCEL_PREFIX must be an `internal` location aliased to UPLOAD_FOLDER.
+app.config['DOWNLOAD_OFFLOAD'] = os.getenv('DOWNLOAD_OFFLOAD', '').lower()
+app.config['DOWNLOAD_ACCEL_PREFIX'] = '/' + os.getenv('DOWNLOAD_ACCEL_PREFIX', '/protected-uploads/').strip('/') + '/'
 
 # --- Configure Database (For Render PostgreSQL and Local SQLite) ---
 if 'DATABASE_URL' in os.environ:
@@ -38,6 +79,20 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(app.instance_path, 'app.db')
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool per worker process for server databases (SQLite keeps SQLAlchemy's defaults). pre_ping checks each
+# connection on checkout, so ones the server or a proxy dropped while idle are replaced instead of failing a
+# request, and pool_recycle retires connections before typical idle timeouts.
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ['true', '1', 't'],
+    }
+# Warm-up (see warm_up and gunicorn.conf.py) can also import the Gemini SDK, so workers do not pay for it
+# on their first Expert Lane answer.
+app.config['WARM_UP_LLM'] = os.getenv('WARM_UP_LLM', 'false').lower() in ['true', '1', 't']
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
@@ -49,7 +104,20 @@ app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER')
 app.config['MAIL_RECIPIENT'] = os.getenv('MAIL_RECIPIENT')
-mail = Mail(app)
+# 'thread' delivers the outbox from a background thread in each web process, 'worker' leaves it
+# to a separate `flask mail-worker` process, 'sync' delivers inside the request that queued it.
+app.config['MAIL_DELIVERY_MODE'] = os.getenv('MAIL_DELIVERY_MODE', 'thread').lower()
+app.config['MAIL_MAX_ATTEMPTS'] = int(os.getenv('MAIL_MAX_ATTEMPTS', 6))
+app.config['MAIL_RETRY_BASE_SECONDS'] = int(os.getenv('MAIL_RETRY_BASE_SECONDS', 30))
+app.config['MAIL_POLL_INTERVAL'] = float(os.getenv('MAIL_POLL_INTERVAL', 5))
+# Attachment policy for notification emails: files up to MAIL_ATTACHMENT_INLINE_MAX are attached while the
+# total stays under MAIL_ATTACHMENT_TOTAL_MAX; the rest are either linked ('link') or stream-encoded ('stream').
+app.config['MAIL_ATTACHMENT_INLINE_MAX'] = int(os.getenv('MAIL_ATTACHMENT_INLINE_MAX', 2 * 1024 * 1024))
+app.config['MAIL_ATTACHMENT_TOTAL_MAX'] = int(os.getenv('MAIL_ATTACHMENT_TOTAL_MAX', 5 * 1024 * 1024))
+app.config['MAIL_ATTACHMENT_OVERFLOW'] = os.getenv('MAIL_ATTACHMENT_OVERFLOW', 'link').lower()
+app.config['APP_BASE_URL'] = os.getenv('APP_BASE_URL', '').rstrip('/')
+# Flask-Mail is set up by get_mail() in the process that actually delivers, see the outbox section.
+mail = None
 
 # --- Configure Flask-Login ---
 login_manager = LoginManager()
@@ -58,6 +126,71 @@ login_manager.login_view = 'login'
 login_manager.login_message = "You must be logged in to access the admin panel."
 login_manager.login_message_category = "error"
 
+# --- Configure Event Logging ---
+# 'buffered' batches EventLog inserts on a background thread; 'sync' commits each event inside the request.
+app.config['EVENT_LOG_MODE'] = os.getenv('EVENT_LOG_MODE', 'buffered').lower()
+app.config['EVENT_LOG_BUFFER_SIZE'] = int(os.getenv('EVENT_LOG_BUFFER_SIZE', 10000))
+app.config['EVENT_LOG_BATCH_SIZE'] = int(os.getenv('EVENT_LOG_BATCH_SIZE', 200))
+app.config['EVENT_LOG_FLUSH_INTERVAL'] = float(os.getenv('EVENT_LOG_FLUSH_INTERVAL', 2.0))
+# `flask eventlog-compact` moves events older than the retention window to gzip NDJSON files, one folder per month.
+app.config['EVENT_LOG_RETENTION_DAYS'] = int(os.getenv('EVENT_LOG_RETENTION_DAYS', 90))
+app.config['EVENT_LOG_ARCHIVE_FOLDER'] = os.getenv('EVENT_LOG_ARCHIVE_FOLDER', os.path.join(app.instance_path, 'event_archive'))
+app.config['EVENT_LOG_COMPACT_BATCH_SIZE'] = int(os.getenv('EVENT_LOG_COMPACT_BATCH_SIZE', 5000))
+
+# --- Configure Chatbot Response Cache ---
+# Backend is 'memory' (per worker), 'sqlite' (shared file, all workers on the host) or 'none'.
+app.config['CHATBOT_CACHE_BACKEND'] = os.getenv('CHATBOT_CACHE_BACKEND', 'memory').lower()
+app.config['CHATBOT_CACHE_TTL'] = int(os.getenv('CHATBOT_CACHE_TTL', 6 * 3600))
+app.config['CHATBOT_CACHE_MAXSIZE'] = int(os.getenv('CHATBOT_CACHE_MAXSIZE', 512))
+app.config['CHATBOT_CACHE_PATH'] = os.getenv('CHATBOT_CACHE_PATH', os.path.join(app.instance_path, 'chatbot_cache.db'))
+
+# --- Configure Gemini Call Guard ---
+app.config['LLM_TIMEOUT_SECONDS'] = float(os.getenv('LLM_TIMEOUT_SECONDS', 20))
+app.config['LLM_MAX_CONCURRENCY'] = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+app.config['LLM_BREAKER_THRESHOLD'] = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))
+app.config['LLM_BREAKER_RESET_SECONDS'] = float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30))
+
+# --- Configure Static Page Cache ---
+# Marketing pages are rendered once per template version and revalidated with ETags. With the default
+# max-age of 0 browsers and CDNs revalidate every view, so visits still reach visitor_tracker (as cheap 304s);
+# a positive max-age saves those round trips at the cost of not counting repeat views.
+app.config['PAGE_CACHE_ENABLED'] = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() in ['true', '1', 't']
+app.config['PAGE_CACHE_MAX_AGE'] = int(os.getenv('PAGE_CACHE_MAX_AGE', 0))
+
+# --- Configure Public Content Cache ---
+# Active announcements and job openings are cached per worker; workers re-read the shared version
+# stamps at most this often, which bounds how long another worker can serve content an admin just changed.
+app.config['CONTENT_CACHE_CHECK_INTERVAL'] = float(os.getenv('CONTENT_CACHE_CHECK_INTERVAL', 2.0))
+# Admin identities (id, username) loaded for login_required requests are cached the same way, and
+# additionally expire after this many seconds.
+app.config['ADMIN_IDENTITY_TTL'] = float(os.getenv('ADMIN_IDENTITY_TTL', 60))
+
+# --- Configure Rate Limiting ---
+# Token buckets per endpoint, as comma-separated `scope:count/period` rules: scope is ip, email or global
+# (a shared bucket that sheds load once the endpoint as a whole is too busy), e.g. 'ip:5/10minute,email:3/hour'.
+# Backend is 'memory' (per worker), 'sqlite' (shared by all workers on the host) or 'none'.
+app.config['RATE_LIMIT_BACKEND'] = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+app.config['RATE_LIMIT_PATH'] = os.getenv('RATE_LIMIT_PATH', os.path.join(app.instance_path, 'rate_limits.db'))
+app.config['RATE_LIMITS'] = {
+    'send_otp': os.getenv('RATE_LIMIT_SEND_OTP', 'ip:5/10minute,email:3/10minute,global:120/minute'),
+    'verify_otp': os.getenv('RATE_LIMIT_VERIFY_OTP', 'ip:10/10minute'),
+    'chatbot': os.getenv('RATE_LIMIT_CHATBOT', 'ip:20/minute,global:300/minute'),
+    'contact': os.getenv('RATE_LIMIT_CONTACT', 'ip:5/hour,email:5/hour'),
+    'apply': os.getenv('RATE_LIMIT_APPLY', 'ip:5/hour,email:3/hour'),
+}
+
+# --- Configure Instrumentation ---
+# Per-request latency, SQL and external-call time go out as Server-Timing headers and as Prometheus
+# histograms on /metrics (values are per worker process). /metrics is only served to a logged-in admin, or
+# with `Authorization: Bearer <METRICS_TOKEN>` for scrapers; with no token set, scrapers get 401.
+app.config['SERVER_TIMING_ENABLED'] = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() in ['true', '1', 't']
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+# Sampling profiler, off unless PROFILE_SLOW_REQUESTS (seconds) is set: stacks of requests slower than that
+# are written to PROFILE_FOLDER as collapsed stacks for flamegraph.pl / speedscope.
+app.config['PROFILE_SLOW_REQUESTS'] = float(os.getenv('PROFILE_SLOW_REQUESTS', 0))
+app.config['PROFILE_INTERVAL'] = float(os.getenv('PROFILE_INTERVAL', 0.005))
+app.config['PROFILE_FOLDER'] = os.getenv('PROFILE_FOLDER', os.path.join(app.instance_path, 'profiles'))
+
 # --- Set up logging ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -88,6 +221,23 @@ class Application(db.Model):
     status = db.Column(db.String(50), default='New', nullable=False)
     submission_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     replies = db.relationship('AdminReply', backref='application', lazy=True, cascade="all, delete-orphan")
+    files = db.relationship('ApplicationFile', backref='application', lazy=True, cascade="all, delete-orphan", order_by='ApplicationFile.id')
+    __table_args__ = (db.Index('ix_application_submission_date_status', 'submission_date', 'status'),)
+
+class Blob(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class ApplicationFile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, index=True)
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blob.sha256'), nullable=False)
+    field_name = db.Column(db.String(50))
+    filename = db.Column(db.String(200), nullable=False)
+    content_type = db.Column(db.String(100))
+    size = db.Column(db.BigInteger, nullable=False)
 
 class ContactMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -98,14 +248,15 @@ class ContactMessage(db.Model):
     status = db.Column(db.String(50), default='New', nullable=False)
     submission_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     replies = db.relationship('AdminReply', backref='message', lazy=True, cascade="all, delete-orphan")
+    __table_args__ = (db.Index('ix_contact_message_submission_date_status', 'submission_date', 'status'),)
 
 class AdminReply(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     reply_content = db.Column(db.Text, nullable=False)
     reply_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=True)
-    message_id = db.Column(db.Integer, db.ForeignKey('contact_message.id'), nullable=True)
-    author_id = db.Column(db.Integer, db.ForeignKey('admin_user.id'), nullable=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=True, index=True)
+    message_id = db.Column(db.Integer, db.ForeignKey('contact_message.id'), nullable=True, index=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('admin_user.id'), nullable=False, index=True)
 
 class JobOpening(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -113,8 +264,10 @@ class JobOpening(db.Model):
     location_type = db.Column(db.String(100), nullable=False)
     job_type = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    is_active = db.Column(db.Boolean, default=True)
+    # active_history: the dashboard counters need the old value even when an expired instance is flipped.
+    is_active = db.column_property(db.Column(db.Boolean, default=True), active_history=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    __table_args__ = (db.Index('ix_job_opening_is_active_created_at', 'is_active', 'created_at'),)
 
 class Announcement(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -122,7 +275,27 @@ class Announcement(db.Model):
     content = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    is_active = db.Column(db.Boolean, default=True)
+    # active_history: the dashboard counters need the old value even when an expired instance is flipped.
+    is_active = db.column_property(db.Column(db.Boolean, default=True), active_history=True)
+    __table_args__ = (db.Index('ix_announcement_is_active_category_date', 'is_active', 'category', 'date'),
+                      db.Index('ix_announcement_is_active_date', 'is_active', 'date'))
+
+class ContentVersion(db.Model):
+    """One row per cached public model; `version` is bumped in every transaction that changes that model."""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class DashboardStats(db.Model):
+    """Single row (id=1) of admin dashboard counters, kept current by session events and apply_rollups."""
+    id = db.Column(db.Integer, primary_key=True)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    messages = db.Column(db.Integer, nullable=False, default=0)
+    users = db.Column(db.Integer, nullable=False, default=0)
+    active_openings = db.Column(db.Integer, nullable=False, default=0)
+    active_announcements = db.Column(db.Integer, nullable=False, default=0)
+    page_views = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
 class EventLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -130,51 +303,577 @@ class EventLog(db.Model):
     ip_address = db.Column(db.String(45))
     event_type = db.Column(db.String(100))
     details = db.Column(db.Text)
+    # event_type filters (admin table, rollup rebuilds) and the unfiltered timestamp order (listing, export, retention)
+    __table_args__ = (db.Index('ix_event_log_event_type_timestamp', 'event_type', 'timestamp'),
+                      db.Index('ix_event_log_timestamp', 'timestamp'))
+
+class TrafficRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    event_type = db.Column(db.String(100), nullable=False)
+    path = db.Column(db.String(300), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (db.UniqueConstraint('granularity', 'bucket_start', 'event_type', 'path', name='uq_traffic_rollup_bucket'),)
+
+class OutboxMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(300), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)  # JSON list
+    sender = db.Column(db.String(200))
+    body = db.Column(db.Text)
+    html = db.Column(db.Text)
+    attachments = db.Column(db.Text)  # JSON list of {'path', 'filename', 'content_type'}, paths relative to UPLOAD_FOLDER
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    claimed_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
 
 # ==============================================================================
 #  HELPER FUNCTIONS
 # ==============================================================================
-def log_event(event_type, details=""):
+ROLLUP_GRANULARITIES = ('hour', 'day')
+
+def event_path(event_type, details):
+    """Recovers the visited path from a PAGE_VISIT event; other events are rolled up without a path."""
+    if event_type == 'PAGE_VISIT' and details and details.startswith('Visited: '):
+        return details[len('Visited: '):][:300]
+    return ''
+
+def bucket_start(ts, granularity):
+    ts = ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == 'day' else ts
+
+def aggregate_rollups(events, counts=None):
+    """Folds events into {(granularity, bucket_start, event_type, path): count}."""
+    counts = {} if counts is None else counts
+    for ev in events:
+        ts = ev.get('timestamp') or datetime.now(timezone.utc)
+        event_type = ev.get('event_type') or ''
+        path = event_path(event_type, ev.get('details'))
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (granularity, bucket_start(ts, granularity), event_type, path)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def upsert(model):
+    """INSERT for `model` in the engine's dialect, which adds on_conflict_do_update (PostgreSQL and SQLite)."""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def apply_rollups(counts):
+    """Adds aggregated counts to TrafficRollup with an upsert. The caller owns the transaction."""
+    if not counts:
+        return
+    rows = [{'granularity': g, 'bucket_start': b, 'event_type': e, 'path': p, 'count': n} for (g, b, e, p), n in counts.items()]
+    stmt = upsert(TrafficRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['granularity', 'bucket_start', 'event_type', 'path'],
+        set_={'count': TrafficRollup.count + stmt.excluded.count},
+    )
+    db.session.execute(stmt, rows)
+    page_views = sum(n for (g, _, e, _), n in counts.items() if g == 'day' and e == 'PAGE_VISIT')
+    if page_views:
+        db.session.execute(db.update(DashboardStats).where(DashboardStats.id == 1).values(page_views=DashboardStats.page_views + page_views))
+
+def write_event_batch(events):
+    """Bulk-inserts a batch of buffered events into EventLog and its rollups in a single transaction."""
+    with app.app_context():
+        try:
+            db.session.execute(db.insert(EventLog), events)
+            apply_rollups(aggregate_rollups(events))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+event_sink = BufferedEventSink(
+    write_event_batch,
+    max_size=app.config['EVENT_LOG_BUFFER_SIZE'],
+    batch_size=app.config['EVENT_LOG_BATCH_SIZE'],
+    flush_interval=app.config['EVENT_LOG_FLUSH_INTERVAL'],
+)
+
+def log_event_sync(event_type, details=""):
     try:
         if request:
-            ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
-            log = EventLog(ip_address=ip_address, event_type=event_type, details=details)
+            ip_address = request.remote_addr
+            log = EventLog(ip_address=ip_address, event_type=event_type, details=details, timestamp=datetime.now(timezone.utc))
             db.session.add(log)
+            apply_rollups(aggregate_rollups([{'timestamp': log.timestamp, 'event_type': event_type, 'details': details}]))
             db.session.commit()
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error logging event: {e}")
 
+def log_event(event_type, details=""):
+    if app.config['EVENT_LOG_MODE'] == 'sync':
+        return log_event_sync(event_type, details)
+    try:
+        if request:
+            ip_address = request.remote_addr
+            event_sink.emit({'timestamp': datetime.now(timezone.utc), 'ip_address': ip_address, 'event_type': event_type, 'details': details})
+    except Exception as e:
+        logger.error(f"Error buffering event: {e}")
+
+# --- Public content cache ---
+CACHED_CONTENT_MODELS = {Announcement: 'announcement', JobOpening: 'jobopening', AdminUser: 'adminuser'}
+
+def load_content_versions():
+    return dict(db.session.execute(db.select(ContentVersion.name, ContentVersion.version)).all())
+
+content_cache = VersionedContentCache(load_content_versions, app.config['CONTENT_CACHE_CHECK_INTERVAL'])
+
+def bump_content_version(session, name):
+    """Marks cached model `name` as changed in the session's transaction. Bulk writes that skip the ORM call it directly."""
+    now = datetime.now(timezone.utc)
+    stmt = upsert(ContentVersion).values(name=name, version=1, updated_at=now)
+    session.execute(stmt.on_conflict_do_update(index_elements=['name'],
+                                               set_={'version': ContentVersion.version + 1, 'updated_at': now}))
+    session.info.setdefault('content_changed', set()).add(name)
+
+@event.listens_for(db.session, 'before_flush')
+def bump_content_versions(session, flush_context, instances):
+    """Bumps the version of every cached model this flush changes, inside the same transaction."""
+    changed = {name for obj in list(session.new) + list(session.deleted) + [o for o in session.dirty if session.is_modified(o)]
+               for model, name in CACHED_CONTENT_MODELS.items() if isinstance(obj, model)}
+    for name in changed:
+        bump_content_version(session, name)
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_content_cache(session):
+    if session.info.pop('content_changed', None):
+        content_cache.invalidate()
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_content_changes(session):
+    session.info.pop('content_changed', None)
+
+# --- Dashboard counters ---
+# model: (DashboardStats column, boolean attribute that must be true for the row to count, or None)
+DASHBOARD_COUNTERS = {
+    Application: ('applications', None), ContactMessage: ('messages', None), AdminUser: ('users', None),
+    JobOpening: ('active_openings', 'is_active'), Announcement: ('active_announcements', 'is_active'),
+}
+
+@event.listens_for(db.session, 'before_flush')
+def update_dashboard_stats(session, flush_context, instances):
+    """Applies this flush's inserts, deletes and is_active flips to the counters row, in the same transaction."""
+    deltas = {}
+    def add(obj, delta):
+        column, _ = DASHBOARD_COUNTERS[type(obj)]
+        deltas[column] = deltas.get(column, 0) + delta
+    for obj in session.new:
+        if type(obj) in DASHBOARD_COUNTERS:
+            flag = DASHBOARD_COUNTERS[type(obj)][1]
+            value = getattr(obj, flag) if flag else True
+            if value is None or value: add(obj, 1)  # None: the column default (active) applies on insert
+    for obj in session.deleted:
+        if type(obj) in DASHBOARD_COUNTERS:
+            flag = DASHBOARD_COUNTERS[type(obj)][1]
+            history = inspect(obj).attrs[flag].history if flag else None
+            if flag is None or (history.deleted[0] if history.deleted else getattr(obj, flag)): add(obj, -1)
+    for obj in session.dirty:
+        flag = DASHBOARD_COUNTERS.get(type(obj), (None, None))[1]
+        if flag is None: continue
+        history = inspect(obj).attrs[flag].history  # is_active is mapped with active_history, so deleted holds the old value
+        if history.added and history.deleted and bool(history.added[0]) != bool(history.deleted[0]):
+            add(obj, 1 if history.added[0] else -1)
+    deltas = {column: getattr(DashboardStats, column) + delta for column, delta in deltas.items() if delta}
+    if deltas:
+        session.execute(db.update(DashboardStats).where(DashboardStats.id == 1).values(updated_at=datetime.now(timezone.utc), **deltas))
+
+def reconcile_dashboard_stats():
+    """Recomputes every dashboard counter from the source tables. The caller owns the transaction."""
+    stats = db.session.get(DashboardStats, 1) or DashboardStats(id=1)
+    stats.applications = db.session.scalar(db.select(db.func.count(Application.id)))
+    stats.messages = db.session.scalar(db.select(db.func.count(ContactMessage.id)))
+    stats.users = db.session.scalar(db.select(db.func.count(AdminUser.id)))
+    stats.active_openings = db.session.scalar(db.select(db.func.count(JobOpening.id)).where(JobOpening.is_active==True))
+    stats.active_announcements = db.session.scalar(db.select(db.func.count(Announcement.id)).where(Announcement.is_active==True))
+    stats.page_views = db.session.scalar(db.select(db.func.coalesce(db.func.sum(TrafficRollup.count), 0)).where(TrafficRollup.granularity=='day', TrafficRollup.event_type=='PAGE_VISIT'))
+    stats.updated_at = datetime.now(timezone.utc)
+    db.session.add(stats)
+    return stats
+
+class AdminIdentity(UserMixin):
+    """Detached, cacheable stand-in for AdminUser as `current_user`: just the id and username."""
+    def __init__(self, id, username):
+        self.id, self.username = id, username
+
+def admin_identity(user_id):
+    """Cached AdminIdentity for `user_id` (None if no such user); any AdminUser change in any process invalidates it."""
+    def load():
+        row = db.session.execute(db.select(AdminUser.id, AdminUser.username).where(AdminUser.id == user_id)).first()
+        return AdminIdentity(row.id, row.username) if row else None
+    return content_cache.get(f'adminuser:{user_id}', ['adminuser'], load, ttl=app.config['ADMIN_IDENTITY_TTL'])
+
+def admin_identities(user_ids):
+    """{user_id: AdminIdentity or None} from the same cache as `admin_identity`; all misses are fetched with one query."""
+    keys = {f'adminuser:{user_id}': user_id for user_id in set(user_ids) if user_id is not None}
+    def load(missing):
+        rows = db.session.execute(db.select(AdminUser.id, AdminUser.username).where(AdminUser.id.in_([keys[k] for k in missing])))
+        return {f'adminuser:{row.id}': AdminIdentity(row.id, row.username) for row in rows}
+    cached = content_cache.get_many(keys, ['adminuser'], load, ttl=app.config['ADMIN_IDENTITY_TTL']) if keys else {}
+    return {keys[key]: identity for key, identity in cached.items()}
+
+def active_announcements():
+    """Active announcements, newest first, as detached rows (attribute access like the model)."""
+    return content_cache.get('announcements', ['announcement'], lambda: db.session.execute(
+        db.select(*Announcement.__table__.c).where(Announcement.is_active.is_(True)).order_by(Announcement.date.desc())).all())
+
+def active_job_openings():
+    return content_cache.get('job_openings', ['jobopening'], lambda: db.session.execute(
+        db.select(*JobOpening.__table__.c).where(JobOpening.is_active.is_(True)).order_by(JobOpening.created_at.desc())).all())
+
+# --- Rate limiting ---
+rate_limiter = create_rate_limiter(app.config['RATE_LIMIT_BACKEND'], app.config['RATE_LIMIT_PATH'])
+rate_limit_rules = {name: parse_rules(spec) for name, spec in app.config['RATE_LIMITS'].items()}
+rate_limit_stats = {name: {'allowed': 0, 'rejected': 0} for name in rate_limit_rules}
+
+def client_ip():
+    # remote_addr, not the leftmost X-Forwarded-For entry: that one is whatever the client sent (see TRUSTED_PROXY_HOPS).
+    return request.remote_addr or ''
+
+forwarded_for_warned = False
+
+def warn_untrusted_forwarded_for():
+    """With no trusted hops, X-Forwarded-For means a proxy is ignored: every client shares its IP in buckets and the EventLog."""
+    global forwarded_for_warned
+    if not forwarded_for_warned and 'X-Forwarded-For' in request.headers:
+        forwarded_for_warned = True
+        logger.warning("X-Forwarded-For received while TRUSTED_PROXY_HOPS is 0: client IPs are the proxy's (%s). "
+                       "Set TRUSTED_PROXY_HOPS to the number of proxies in front of the app.", request.remote_addr)
+
+if app.config['TRUSTED_PROXY_HOPS'] == 0:
+    app.before_request(warn_untrusted_forwarded_for)
+
+def rate_limited(name):
+    """Rejects the request with 429 + Retry-After once any of the endpoint's token buckets is empty."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if rate_limiter is not None:
+                for scope, capacity, period in rate_limit_rules.get(name, ()):
+                    if scope == 'ip': subject = client_ip()
+                    elif scope == 'email': subject = ((request.get_json(silent=True) or {}).get('email') or request.form.get('email') or '').strip().lower()
+                    else: subject = '*'
+                    if not subject: continue
+                    allowed, retry_after = rate_limiter.hit(f"{name}:{scope}:{subject}", capacity, period)
+                    if not allowed:
+                        rate_limit_stats[name]['rejected'] += 1
+                        logger.warning(f"Rate limit '{name}' ({scope}) exceeded by {subject}")
+                        response = jsonify({'error': 'Too many requests. Please try again later.'})
+                        response.status_code = 429
+                        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                        return response
+                rate_limit_stats[name]['allowed'] += 1
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# --- Instrumentation ---
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram('http_request_duration_seconds', 'Request latency, streamed bodies included.', ['method', 'endpoint', 'status'])
+REQUEST_DB_STATEMENTS = metrics.histogram('http_request_db_statements', 'SQL statements executed per request.', ['endpoint'], COUNT_BUCKETS)
+REQUEST_DB_SECONDS = metrics.histogram('http_request_db_seconds', 'Time spent in SQL statements per request.', ['endpoint'])
+EXTERNAL_SECONDS = metrics.histogram('external_call_duration_seconds', 'Calls to Gemini, SMTP and the live-update APIs.', ['service'])
+metrics.callback('event_log_events_total', 'Analytics events handled by the buffered EventLog writer, by outcome.', 'counter', ['outcome'],
+                 lambda: {(outcome,): n for outcome, n in event_sink.counters().items() if outcome != 'batches'})
+metrics.callback('event_log_buffer_pending', 'Analytics events waiting in the buffer.', 'gauge', [], lambda: {(): event_sink.pending()})
+profiler = SlowRequestProfiler(app.config['PROFILE_FOLDER'], app.config['PROFILE_SLOW_REQUESTS'],
+                               app.config['PROFILE_INTERVAL']) if app.config['PROFILE_SLOW_REQUESTS'] > 0 else None
+
+def current_timings():
+    return g.get('timings') if has_request_context() else None
+
+@contextlib.contextmanager
+def external_call(service, timings=None):
+    """Times a call to an outside service, into EXTERNAL_SECONDS and the Server-Timing of the request it serves."""
+    timings = timings or current_timings()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_SECONDS.observe(elapsed, service)
+        if timings is not None: timings.add(service, elapsed)
+
+def start_request_timing():
+    g.timings = RequestTimings()
+    if profiler is not None: g.profile_token = profiler.start()
+
+def finish_request_timing(response):
+    """Adds Server-Timing (time to the headers) and records the histograms once the body has been sent."""
+    timings = g.get('timings')
+    if timings is None:
+        return response
+    if app.config['SERVER_TIMING_ENABLED']:
+        response.headers['Server-Timing'] = timings.server_timing()
+    method, endpoint, status, path = request.method, request.url_rule.rule if request.url_rule else '<unmatched>', str(response.status_code), request.path
+    profile_token = g.get('profile_token')
+
+    def record():
+        elapsed = timings.elapsed()
+        REQUEST_SECONDS.observe(elapsed, method, endpoint, status)
+        REQUEST_DB_STATEMENTS.observe(timings.counts.get('db', 0), endpoint)
+        REQUEST_DB_SECONDS.observe(timings.durations.get('db', 0.0), endpoint)
+        if profile_token is not None:
+            profile_path = profiler.stop(profile_token, elapsed, f"{method} {endpoint}")
+            if profile_path: logger.warning(f"Slow request {method} {path} took {elapsed:.2f}s, stacks written to {profile_path}")
+    response.call_on_close(record)
+    return response
+
+# Registered first so the timing covers every other hook (after_request hooks run in reverse order).
+app.before_request(start_request_timing)
+app.after_request(finish_request_timing)
+
+def time_sql_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info['statement_started'] = time.perf_counter()
+
+def record_sql_time(conn):
+    started = conn.info.pop('statement_started', None)
+    timings = current_timings()
+    if started is not None and timings is not None: timings.add('db', time.perf_counter() - started)
+
+def time_sql_end(conn, cursor, statement, parameters, context, executemany):
+    record_sql_time(conn)
+
+def time_sql_error(context):
+    # A failed statement never reaches after_cursor_execute; it still took database time.
+    if context.connection is not None: record_sql_time(context.connection)
+
+with app.app_context():
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', time_sql_start)
+        event.listen(engine, 'after_cursor_execute', time_sql_end)
+        event.listen(engine, 'handle_error', time_sql_error)
+
 def visitor_tracker():
-    if request.path and not request.path.startswith(('/static', '/api', '/download', '/admin', '/favicon.ico')):
+    if request.path and not request.path.startswith(('/static', '/api', '/download', '/admin', '/metrics', '/favicon.ico')):
          log_event('PAGE_VISIT', f"Visited: {request.path}")
 
 app.before_request(visitor_tracker)
 
 chatbot = None
+chatbot_lock = threading.Lock()
 def get_chatbot():
-    """Initializes the chatbot on the first request that needs it."""
+    """Initializes the chatbot on the first request that needs it (exactly once, even with threaded workers)."""
     global chatbot
-    if chatbot is None:
-        try:
-            logger.info("Initializing chatbot for the first time...")
-            chatbot = create_enhanced_chatbot()
-            chatbot.load_model()
-            logger.info("Chatbot initialized successfully!")
-        except Exception as e:
-            logger.error(f"FATAL: Failed to initialize chatbot: {e}", exc_info=True)
+    if chatbot is not None:
+        return chatbot
+    with chatbot_lock:
+        if chatbot is None:
+            try:
+                logger.info("Initializing chatbot for the first time...")
+                from download_model import create_enhanced_chatbot
+                guard = LLMGuard(timeout=app.config['LLM_TIMEOUT_SECONDS'], max_concurrency=app.config['LLM_MAX_CONCURRENCY'],
+                                 breaker=CircuitBreaker(app.config['LLM_BREAKER_THRESHOLD'], app.config['LLM_BREAKER_RESET_SECONDS']))
+                bot = create_enhanced_chatbot(response_cache=create_response_cache(
+                    app.config['CHATBOT_CACHE_BACKEND'], app.config['CHATBOT_CACHE_MAXSIZE'],
+                    app.config['CHATBOT_CACHE_TTL'], app.config['CHATBOT_CACHE_PATH']), llm_guard=guard, timer=external_call)
+                bot.load_model()
+                chatbot = bot
+                logger.info("Chatbot initialized successfully!")
+            except Exception as e:
+                logger.error(f"FATAL: Failed to initialize chatbot: {e}", exc_info=True)
     return chatbot
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in {'pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'}
 
+def acquire_blob(sha256, size):
+    """Adds a reference to a stored blob, creating its row on first use (one upsert, so concurrent uploads of the same content both count)."""
+    stmt = upsert(Blob).values(sha256=sha256, size=size, ref_count=1)
+    db.session.execute(stmt.on_conflict_do_update(index_elements=['sha256'], set_={'ref_count': Blob.ref_count + 1}))
+
+def release_blobs(shas):
+    """
+    Drops one reference per sha and deletes the rows nobody references any more. Call it after the
+    ApplicationFile rows are flushed away (they hold foreign keys to Blob). Returns the shas whose last
+    reference went away; delete their files after commit.
+    """
+    orphaned = []
+    for sha256 in shas:
+        db.session.execute(db.update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+        if db.session.execute(db.delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0)).rowcount:
+            orphaned.append(sha256)
+    return orphaned
+
+def purge_blob_files(shas):
+    for sha256 in shas:
+        # A concurrent upload of the same content may have re-created the row since we released it.
+        if db.session.get(Blob, sha256) is None:
+            blob_store.delete(sha256)
+
+def blob_attachment(app_file, folder):
+    """Describes a manifest entry for the outbox: `path` is where the bytes live, `url_path` is its download URL."""
+    return {'path': os.path.join(BLOB_SUBDIR, blob_store.relative_path(app_file.blob_sha256)), 'filename': app_file.filename,
+            'content_type': app_file.content_type, 'url_path': f"{folder}/{app_file.filename}", 'field': app_file.field_name}
+
+# ==============================================================================
+#  MAIL OUTBOX
+# ==============================================================================
+MAIL_CLAIM_LEASE = timedelta(minutes=10)
+mail_wakeup = threading.Event()
+mail_thread = None
+mail_thread_pid = None
+mail_thread_lock = threading.Lock()
+
+def get_mail():
+    """The Flask-Mail extension, created on first delivery so web workers that never send skip the import."""
+    global mail
+    if mail is None:
+        with mail_thread_lock:
+            if mail is None:
+                from flask_mail import Mail
+                mail = Mail(app)
+    return mail
+
+def enqueue_mail(subject, recipients, body=None, html=None, attachments=None, sender=None):
+    """
+    Adds an email to the outbox in the caller's session. It is only delivered once the
+    caller commits, so the email and the row that triggered it are stored atomically.
+    """
+    outbox_item = OutboxMessage(
+        subject=subject, recipients=json.dumps(recipients), sender=sender, body=body, html=html,
+        attachments=json.dumps(attachments) if attachments else None,
+    )
+    db.session.add(outbox_item)
+    return outbox_item
+
+def notify_mail_worker():
+    """Called after committing queued mail so it goes out without waiting for the next poll."""
+    mode = app.config['MAIL_DELIVERY_MODE']
+    if mode == 'sync':
+        deliver_outbox_batch()
+    elif mode == 'thread':
+        ensure_mail_thread()
+        mail_wakeup.set()
+
+def send_outbox_item(conn, item):
+    """
+    Sends one outbox message on an open connection, applying the attachment policy: small files
+    are attached, large ones become download links or are base64-encoded from disk while sending.
+    """
+    recipients = json.loads(item.recipients)
+    sender = item.sender or app.config['MAIL_DEFAULT_SENDER']
+    body, html = item.body, item.html
+    inline_max, total_max = app.config['MAIL_ATTACHMENT_INLINE_MAX'], app.config['MAIL_ATTACHMENT_TOTAL_MAX']
+    attached, linked = plan_attachments(json.loads(item.attachments or '[]'), app.config['UPLOAD_FOLDER'],
+                                        inline_max, total_max, app.config['MAIL_ATTACHMENT_OVERFLOW'])
+    if html: html = html.replace(ATTACHMENTS_NOTE, attachments_note(attached, linked))
+    if linked:
+        base_url = app.config['APP_BASE_URL']
+        if html: html += download_links_html(linked, base_url)
+        else: body = (body or '') + download_links_text(linked, base_url)
+
+    if conn.host is not None and needs_streaming(attached, inline_max, total_max):
+        send_streamed(conn.host, sender, recipients, iter_mime_message(item.subject, sender, recipients, body, html, attached))
+        return
+    from flask_mail import Message
+    msg = Message(item.subject, recipients=recipients, body=body, html=html, sender=sender)
+    for attachment in attached:
+        with open(attachment['full_path'], 'rb') as fp:
+            msg.attach(attachment['filename'], attachment['content_type'], fp.read())
+    conn.send(msg)
+
+def claim_outbox_batch(limit):
+    """Marks up to `limit` due messages as 'sending'. Conditional updates keep concurrent workers from double-sending."""
+    now = datetime.now(timezone.utc)
+    due = db.session.execute(db.select(OutboxMessage.id, OutboxMessage.status).where(db.or_(
+        db.and_(OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now),
+        db.and_(OutboxMessage.status == 'sending', OutboxMessage.claimed_at <= now - MAIL_CLAIM_LEASE),
+    )).order_by(OutboxMessage.id).limit(limit)).all()
+    claimed = []
+    for item_id, status in due:
+        result = db.session.execute(db.update(OutboxMessage).where(OutboxMessage.id == item_id, OutboxMessage.status == status)
+                                    .values(status='sending', claimed_at=now))
+        if result.rowcount: claimed.append(item_id)
+    db.session.commit()
+    return [db.session.get(OutboxMessage, item_id) for item_id in claimed]
+
+def record_mail_failure(item, error):
+    item.attempts += 1
+    item.last_error = str(error)[:1000]
+    if item.attempts >= app.config['MAIL_MAX_ATTEMPTS']:
+        item.status = 'dead'
+        logger.error(f"Outbox message {item.id} dead-lettered after {item.attempts} attempts: {error}")
+    else:
+        backoff = app.config['MAIL_RETRY_BASE_SECONDS'] * (2 ** (item.attempts - 1))
+        item.status = 'pending'
+        item.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=backoff)
+        logger.warning(f"Outbox message {item.id} failed (attempt {item.attempts}), retrying in {backoff}s: {error}")
+
+def deliver_outbox_batch(limit=50):
+    """Sends one batch of due outbox messages over a single SMTP connection. Returns the number claimed."""
+    items = claim_outbox_batch(limit)
+    if not items:
+        return 0
+    try:
+        with get_mail().connect() as conn:
+            for item in items:
+                try:
+                    with external_call('smtp'):
+                        send_outbox_item(conn, item)
+                    item.status, item.sent_at, item.last_error = 'sent', datetime.now(timezone.utc), None
+                except Exception as e:
+                    record_mail_failure(item, e)
+                db.session.commit()
+    except Exception as e:
+        # Connecting (or closing) the SMTP session failed: every message not yet sent gets a retry.
+        db.session.rollback()
+        for item in items:
+            if item.status == 'sending': record_mail_failure(item, e)
+        db.session.commit()
+    return len(items)
+
+def run_mail_worker(stop_event=None, poll_interval=None):
+    poll_interval = poll_interval or app.config['MAIL_POLL_INTERVAL']
+    while stop_event is None or not stop_event.is_set():
+        with app.app_context():
+            try:
+                while deliver_outbox_batch(): pass
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Mail worker error: {e}")
+            finally:
+                db.session.remove()
+        mail_wakeup.wait(poll_interval)
+        mail_wakeup.clear()
+
+def ensure_mail_thread():
+    """Starts the in-process delivery thread once per process (again after a fork)."""
+    global mail_thread, mail_thread_pid
+    if mail_thread is not None and mail_thread.is_alive() and mail_thread_pid == os.getpid():
+        return
+    with mail_thread_lock:
+        if mail_thread is not None and mail_thread.is_alive() and mail_thread_pid == os.getpid():
+            return
+        mail_thread_pid = os.getpid()
+        mail_thread = threading.Thread(target=run_mail_worker, name='mail-outbox', daemon=True)
+        mail_thread.start()
+
+def start_mail_thread_if_needed():
+    if app.config['MAIL_DELIVERY_MODE'] == 'thread' and app.config.get('MAIL_SERVER'):
+        ensure_mail_thread()
+
+app.before_request(start_mail_thread_if_needed)
+
 # ==============================================================================
 #  AUTHENTICATION & CLI
 # ==============================================================================
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(AdminUser, int(user_id))
+    return admin_identity(int(user_id))
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -209,52 +908,349 @@ def create_admin():
     db.session.commit()
     print(f"Admin user '{username}' created successfully!")
 
+@app.cli.command("rollup-traffic")
+@click.option('--rebuild', is_flag=True, help="Discard existing rollups and recompute them from EventLog.")
+@click.option('--batch-size', default=5000, show_default=True)
+def rollup_traffic(rebuild, batch_size):
+    """Compacts EventLog (and its archive) into TrafficRollup. Only needed for rows written before rollups existed."""
+    event_sink.flush()
+    if not rebuild and db.session.scalar(db.select(db.func.count(TrafficRollup.id))):
+        print("Rollups already exist; pass --rebuild to recompute them from EventLog.")
+        return
+    db.session.execute(db.delete(TrafficRollup))
+    counts, total = {}, 0
+    root = app.config['EVENT_LOG_ARCHIVE_FOLDER']
+    for day in archived_days(root):
+        for ev in iter_archived(root, day, day):
+            if not ev.get('timestamp'): continue
+            aggregate_rollups([dict(ev, timestamp=parse_timestamp(ev['timestamp']))], counts)
+            total += 1
+    rows = db.session.execute(db.select(EventLog.timestamp, EventLog.event_type, EventLog.details).execution_options(yield_per=batch_size))
+    for row in rows:
+        if row.timestamp is None: continue
+        aggregate_rollups([row._asdict()], counts)
+        total += 1
+    apply_rollups(counts)
+    db.session.flush()
+    reconcile_dashboard_stats()
+    db.session.commit()
+    print(f"Rolled up {total} events into {len(counts)} buckets.")
+
+def compact_event_log(retention_days, batch_size=5000, pause=0.0):
+    """
+    Archives EventLog rows older than `retention_days` (whole UTC days) and deletes them in batches of
+    `batch_size`, committing between batches so writers are never blocked for long. TrafficRollup is
+    left untouched, so summary counts and traffic charts keep covering archived days. Safe to re-run
+    after a crash: rows already in an archive part are deleted without being written again.
+    Returns {day: rows archived}.
+    """
+    root = app.config['EVENT_LOG_ARCHIVE_FOLDER']
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    columns = [c.name for c in EventLog.__table__.columns]
+    summary = {}
+    oldest = db.session.scalar(db.select(db.func.min(EventLog.timestamp)).where(EventLog.timestamp < cutoff))
+    while oldest is not None:
+        day = oldest.date()
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        in_day = (EventLog.timestamp >= start, EventLog.timestamp < end)
+        parts = day_parts(root, day)
+        archived = lambda event_id: any(first <= event_id <= last for first, last, _ in parts)  # noqa: E731
+        rows = db.session.execute(db.select(*EventLog.__table__.columns).where(*in_day).order_by(EventLog.id)
+                                  .execution_options(yield_per=batch_size))
+        try:
+            part = write_part(root, day, columns, (row for row in rows if not archived(row.id)))
+        finally:
+            rows.close()
+        # Only rows up to the last archived id are deleted; anything inserted meanwhile waits for the next run.
+        max_id = max([last for _, last, _ in parts] + ([part[2]] if part else []), default=0)
+        while True:
+            batch = db.select(EventLog.id).where(*in_day, EventLog.id <= max_id).limit(batch_size)
+            deleted = db.session.execute(db.delete(EventLog).where(EventLog.id.in_(batch))).rowcount
+            db.session.commit()
+            if deleted < batch_size: break
+            if pause: time.sleep(pause)
+        summary[day] = part[3] if part else 0
+        oldest = db.session.scalar(db.select(db.func.min(EventLog.timestamp)).where(EventLog.timestamp >= end, EventLog.timestamp < cutoff))
+    return summary
+
+@app.cli.command("eventlog-compact")
+@click.option('--retention-days', type=int, help="Keep this many days in EventLog (default: EVENT_LOG_RETENTION_DAYS).")
+@click.option('--batch-size', type=int, help="Rows deleted per transaction (default: EVENT_LOG_COMPACT_BATCH_SIZE).")
+@click.option('--pause', default=0.0, show_default=True, help="Seconds to sleep between delete batches.")
+@click.option('--every', 'every_hours', type=float, help="Keep running, compacting every N hours.")
+def eventlog_compact_command(retention_days, batch_size, pause, every_hours):
+    """Archives old events to NDJSON.gz files and removes them from EventLog."""
+    retention_days = app.config['EVENT_LOG_RETENTION_DAYS'] if retention_days is None else retention_days
+    batch_size = batch_size or app.config['EVENT_LOG_COMPACT_BATCH_SIZE']
+    while True:
+        event_sink.flush()
+        summary = compact_event_log(retention_days, batch_size, pause)
+        for day, count in summary.items():
+            print(f"{day}: archived {count} events")
+        print(f"Compacted {len(summary)} days, {sum(summary.values())} events older than {retention_days} days.")
+        if not every_hours:
+            return
+        time.sleep(every_hours * 3600)
+
+@app.cli.command("eventlog-archive")
+@click.option('--from', 'date_from', required=True, help="First day (ISO date).")
+@click.option('--to', 'date_to', required=True, help="Last day (ISO date), inclusive.")
+@click.option('--event-type', help="Only events of this type.")
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, help="Gzip the output.")
+@click.option('--output', '-o', type=click.File('wb'), default='-', help="Output file (default: stdout).")
+def eventlog_archive_command(date_from, date_to, event_type, fmt, compress, output):
+    """Streams archived events for a date range."""
+    columns = [c.name for c in EventLog.__table__.columns]
+    events = iter_archived(app.config['EVENT_LOG_ARCHIVE_FOLDER'], date.fromisoformat(date_from), date.fromisoformat(date_to), event_type)
+    for chunk in encode_rows(columns, ([event.get(c) for c in columns] for event in events), fmt, compress):
+        output.write(chunk)
+
+@app.cli.command("stats-reconcile")
+def stats_reconcile_command():
+    """Recomputes the admin dashboard counters from the source tables."""
+    event_sink.flush()
+    stats = reconcile_dashboard_stats()
+    db.session.commit()
+    print(f"Dashboard counters: {stats.applications} applications, {stats.messages} messages, {stats.users} users, "
+          f"{stats.active_openings} active openings, {stats.active_announcements} active announcements, {stats.page_views} page views.")
+
+@app.cli.command("uploads-migrate")
+@click.option('--remove-legacy', is_flag=True, help="Delete each legacy folder once its files are in the blob store.")
+def uploads_migrate(remove_legacy):
+    """Moves files from per-application upload folders into the deduplicated blob store."""
+    migrated = 0
+    for app_obj in db.session.execute(db.select(Application).where(~Application.files.any())).scalars():
+        folder_path = os.path.join(app.config['UPLOAD_FOLDER'], app_obj.upload_folder)
+        if not os.path.isdir(folder_path): continue
+        for filename in sorted(os.listdir(folder_path)):
+            file_path = os.path.join(folder_path, filename)
+            if not os.path.isfile(file_path): continue
+            with open(file_path, 'rb') as fp:
+                sha256, size = blob_store.save_stream(fp)
+            acquire_blob(sha256, size)
+            field_name = 'extra_course_cert' if filename == app_obj.extra_course_cert_filename else None
+            app_obj.files.append(ApplicationFile(field_name=field_name, filename=filename, content_type=mimetypes.guess_type(filename)[0], blob_sha256=sha256, size=size))
+            migrated += 1
+        db.session.commit()
+        if remove_legacy: shutil.rmtree(folder_path)
+    print(f"Migrated {migrated} files into the blob store.")
+
+@app.cli.command("uploads-gc")
+@click.option('--min-age-hours', default=24, show_default=True)
+def uploads_gc(min_age_hours):
+    """Deletes blob files that no Blob row references (e.g. left behind by failed submissions)."""
+    known = set(db.session.execute(db.select(Blob.sha256)).scalars())
+    cutoff, removed = datetime.now().timestamp() - min_age_hours * 3600, 0
+    for dirpath, _, filenames in os.walk(blob_store.root):
+        if dirpath == blob_store.tmp_dir: continue
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name not in known and os.path.getmtime(path) < cutoff:
+                os.remove(path); removed += 1
+    print(f"Removed {removed} unreferenced blob files.")
+
+@app.cli.command("mail-worker")
+@click.option('--once', is_flag=True, help="Deliver everything currently due and exit.")
+def mail_worker_command(once):
+    """Delivers queued outbox mail. Run alongside the web app when MAIL_DELIVERY_MODE=worker."""
+    if once:
+        sent = 0
+        while (batch := deliver_outbox_batch()): sent += batch
+        print(f"Processed {sent} outbox messages.")
+        return
+    print("Mail worker started. Press Ctrl+C to stop.")
+    try:
+        run_mail_worker()
+    except KeyboardInterrupt:
+        pass
+
+@app.cli.command("mail-requeue")
+def mail_requeue_command():
+    """Moves dead-lettered outbox messages back to pending."""
+    result = db.session.execute(db.update(OutboxMessage).where(OutboxMessage.status == 'dead')
+                                .values(status='pending', attempts=0, next_attempt_at=datetime.now(timezone.utc)))
+    db.session.commit()
+    print(f"Requeued {result.rowcount} dead-lettered messages.")
+
+@app.cli.command("export")
+@click.argument('model_name', type=click.Choice(['jobopening', 'announcement', 'eventlog', 'application', 'contactmessage']))
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, help="Gzip the output.")
+@click.option('--from', 'date_from', help="Only rows on/after this ISO date or datetime.")
+@click.option('--to', 'date_to', help="Only rows on/before this ISO date (the whole day) or datetime.")
+@click.option('--output', '-o', type=click.File('wb'), default='-', help="Output file (default: stdout).")
+def export_command(model_name, fmt, compress, date_from, date_to, output):
+    """Streams a table to CSV/NDJSON with constant memory."""
+    try:
+        clauses = build_generic_filters(model_name, {'from': date_from, 'to': date_to})
+    except ValueError as e:
+        raise click.BadParameter(f"--from/--to must be ISO dates or datetimes ({e})")
+    event_sink.flush()
+    columns = [c.name for c in GENERIC_MODELS[model_name].__table__.columns]
+    for chunk in encode_rows(columns, iter_export_rows(model_name, clauses), fmt, compress):
+        output.write(chunk)
+
+SEED_NAMES = ['Aarthi', 'Bala', 'Charan', 'Divya', 'Ezhil', 'Farhan', 'Gayathri', 'Hari', 'Indhu', 'Karthik', 'Lakshmi', 'Madhan']
+SEED_CITIES = ['Chennai', 'Coimbatore', 'Madurai', 'Dindigul', 'Oddanchatram', 'Salem', 'Tiruchirappalli']
+SEED_POSITIONS = ['Software Engineer', 'Data Analyst', 'ML Engineer', 'UI/UX Designer', 'QA Engineer', 'Intern']
+SEED_PATHS = ['/', '/about-us', '/services', '/careers', '/announcements', '/contact-us', '/apply',
+              '/services/ai-machine-learning', '/portfolio/cloud-migration', '/portfolio/enterprise-erp']
+
+def seed_data(volumes, days=90, batch_size=5000, seed=0):
+    """
+    Bulk-inserts synthetic rows for load tests: `volumes` maps a GENERIC_MODELS name (plus 'adminreply', replies
+    per application and per message) to a row count, with timestamps spread over the last `days` days. The
+    inserts bypass the unit of work, so traffic rollups, content versions and dashboard counters are brought up
+    to date here. Returns {name: rows inserted}.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    moment = lambda: now - timedelta(seconds=rng.randrange(max(days, 1) * 86400))  # noqa: E731
+    person = lambda i: {'first_name': rng.choice(SEED_NAMES), 'last_name': f'Seed{i}', 'email': f'seed{i}@example.com'}  # noqa: E731
+    authors = db.session.scalars(db.select(AdminUser.id)).all()
+    inserted = {}
+
+    def insert(name, model, rows, after=None):
+        batch, total = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                db.session.execute(db.insert(model), batch)
+                if after: after(batch)
+                db.session.commit()
+                total, batch = total + len(batch), []
+        if batch:
+            db.session.execute(db.insert(model), batch)
+            if after: after(batch)
+            total += len(batch)
+        db.session.commit()
+        inserted[name] = inserted.get(name, 0) + total
+
+    def new_ids(model, first_id):
+        return db.session.scalars(db.select(model.id).where(model.id >= first_id).order_by(model.id)).all()
+
+    def replies(owner_key, owner_ids):
+        for owner_id in owner_ids:
+            for _ in range(volumes.get('adminreply', 0) if authors else 0):
+                yield {owner_key: owner_id, 'author_id': rng.choice(authors), 'reply_date': moment(),
+                       'reply_content': 'Thank you for reaching out. We will get back to you shortly.'}
+
+    next_id = lambda model: (db.session.scalar(db.select(db.func.max(model.id))) or 0) + 1  # noqa: E731
+    event_types = ['PAGE_VISIT'] * 18 + ['CONTACT_SUBMIT', 'APPLICATION_SUBMIT']
+    insert('eventlog', EventLog, ({'timestamp': moment(), 'ip_address': f'10.0.{rng.randrange(256)}.{rng.randrange(256)}',
+                                   'event_type': event_type, 'details': f"Visited: {rng.choice(SEED_PATHS)}" if event_type == 'PAGE_VISIT' else 'Seeded event'}
+                                  for event_type in (rng.choice(event_types) for _ in range(volumes.get('eventlog', 0)))),
+           after=lambda batch: apply_rollups(aggregate_rollups(batch)))
+    first_id = next_id(Application)
+    insert('application', Application, (dict(person(i), phone_number=f'9{rng.randrange(10 ** 9):09d}', city=rng.choice(SEED_CITIES),
+                                             district=rng.choice(SEED_CITIES), position=rng.choice(SEED_POSITIONS), upload_folder=f'seed_{i}',
+                                             status=rng.choice(['New', 'Viewed', 'In Progress', 'Approved', 'Rejected', 'Replied']),
+                                             submission_date=moment()) for i in range(volumes.get('application', 0))))
+    insert('adminreply', AdminReply, replies('application_id', new_ids(Application, first_id)))
+    first_id = next_id(ContactMessage)
+    insert('contactmessage', ContactMessage, (dict(person(i), message_content=f"I would like to know more about your services ({i}).",
+                                                   status=rng.choice(['New', 'Replied']), submission_date=moment())
+                                              for i in range(volumes.get('contactmessage', 0))))
+    insert('adminreply', AdminReply, replies('message_id', new_ids(ContactMessage, first_id)))
+    insert('jobopening', JobOpening, ({'title': f"{rng.choice(SEED_POSITIONS)} {i}", 'location_type': rng.choice(['On-site', 'Remote', 'Hybrid']),
+                                       'job_type': rng.choice(['Full-time', 'Internship', 'Contract']), 'description': 'Seeded opening.',
+                                       'is_active': rng.random() < 0.7, 'created_at': moment()} for i in range(volumes.get('jobopening', 0))))
+    insert('announcement', Announcement, ({'title': f"Seeded announcement {i}", 'content': 'Seeded announcement content.',
+                                           'category': rng.choice(['Award', 'Partnership', 'Vacancy', 'Event', 'General']),
+                                           'is_active': rng.random() < 0.7, 'date': moment()} for i in range(volumes.get('announcement', 0))))
+
+    for name in ('jobopening', 'announcement'):
+        if inserted.get(name): bump_content_version(db.session, name)
+    reconcile_dashboard_stats()
+    db.session.commit()
+    return inserted
+
+@app.cli.command("seed-data")
+@click.option('--events', default=100000, show_default=True, help="EventLog rows (traffic rollups are updated too).")
+@click.option('--applications', default=5000, show_default=True)
+@click.option('--messages', default=5000, show_default=True, help="Contact messages.")
+@click.option('--replies', default=1, show_default=True, help="Admin replies per application and per message (needs an admin user).")
+@click.option('--openings', default=50, show_default=True, help="Job openings, about 70% active.")
+@click.option('--announcements', default=100, show_default=True, help="Announcements, about 70% active.")
+@click.option('--days', default=90, show_default=True, help="Spread timestamps over this many past days.")
+@click.option('--batch-size', default=5000, show_default=True)
+@click.option('--seed', default=0, show_default=True, help="Random seed, for repeatable data sets.")
+def seed_data_command(events, applications, messages, replies, openings, announcements, days, batch_size, seed):
+    """Bulk-inserts synthetic data for load tests and benchmarks. Never run it against production."""
+    event_sink.flush()
+    if replies and not db.session.scalar(db.select(db.func.count(AdminUser.id))):
+        print("No admin user: replies are skipped (run `flask create-admin` first).")
+    started = time.perf_counter()
+    inserted = seed_data({'eventlog': events, 'application': applications, 'contactmessage': messages, 'adminreply': replies,
+                          'jobopening': openings, 'announcement': announcements}, days, batch_size, seed)
+    for name, count in inserted.items():
+        print(f"{name}: {count} rows")
+    print(f"Seeded {sum(inserted.values())} rows in {time.perf_counter() - started:.1f}s.")
+
 # ==============================================================================
 #  FRONTEND ROUTES
 # ==============================================================================
+page_cache = PageCache(app.jinja_env, os.path.join(app.root_path, app.template_folder))
+
+def render_static_page(template, **context):
+    """render_template for pages with constant context: served from page_cache with a strong ETag, 304 on a match."""
+    if app.config['PAGE_CACHE_ENABLED']:
+        body, etag = page_cache.get(request.endpoint, template, context, lambda: render_template(template, **context))
+    else:
+        body = render_template(template, **context).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    max_age = app.config['PAGE_CACHE_MAX_AGE']
+    response.headers['Cache-Control'] = f'public, max-age={max_age}' if max_age > 0 else 'public, no-cache'
+    return response.make_conditional(request)
+
 @app.route('/')
 def home():
-    announcements = db.session.execute(db.select(Announcement).filter_by(is_active=True).order_by(Announcement.date.desc()).limit(3)).scalars().all()
+    announcements = active_announcements()[:3]
     return render_template('index.html', current_page='home', announcements=announcements)
 
 @app.route('/announcements')
 def announcements_page():
-    awards = db.session.execute(db.select(Announcement).filter_by(is_active=True, category='Award').order_by(Announcement.date.desc())).scalars().all()
-    partnerships = db.session.execute(db.select(Announcement).filter_by(is_active=True, category='Partnership').order_by(Announcement.date.desc())).scalars().all()
-    other_news = db.session.execute(db.select(Announcement).filter_by(is_active=True).filter(Announcement.category.notin_(['Award', 'Partnership'])).order_by(Announcement.date.desc())).scalars().all()
+    announcements = active_announcements()
+    awards = [a for a in announcements if a.category == 'Award']
+    partnerships = [a for a in announcements if a.category == 'Partnership']
+    other_news = [a for a in announcements if a.category not in ('Award', 'Partnership')]
     return render_template('announcements_page.html', current_page='announcements', awards=awards, partnerships=partnerships, other_news=other_news)
 
 @app.route('/careers')
 def careers_overview():
-    openings = db.session.execute(db.select(JobOpening).filter_by(is_active=True).order_by(JobOpening.created_at.desc())).scalars().all()
+    openings = active_job_openings()
     return render_template('careers_overview.html', current_page='careers', openings=openings)
 
 @app.route('/about-us')
-def about_details(): return render_template('about_details.html', current_page='about')
+def about_details(): return render_static_page('about_details.html', current_page='about')
 @app.route('/mission-vision')
-def mission_vision(): return render_template('mission_vision.html', current_page='about')
+def mission_vision(): return render_static_page('mission_vision.html', current_page='about')
 @app.route('/services')
-def services_overview(): return render_template('services_overview.html', current_page='services')
+def services_overview(): return render_static_page('services_overview.html', current_page='services')
 @app.route('/services/ai-machine-learning')
-def services_ai(): return render_template('ai_service.html', current_page='services')
+def services_ai(): return render_static_page('ai_service.html', current_page='services')
 @app.route('/services/digital-transformation')
-def services_digital(): return render_template('digital_services.html', current_page='services')
+def services_digital(): return render_static_page('digital_services.html', current_page='services')
 @app.route('/services/software-development')
-def services_software(): return render_template('software_services.html', current_page='services')
+def services_software(): return render_static_page('software_services.html', current_page='services')
 @app.route('/services/cybersecurity')
-def services_cybersecurity(): return render_template('cybersecurity_services.html', current_page='services')
+def services_cybersecurity(): return render_static_page('cybersecurity_services.html', current_page='services')
 @app.route('/portfolio/ai-logistics-platform')
-def portfolio_logistics(): return render_template('portfolio_logistics.html', current_page='portfolio')
+def portfolio_logistics(): return render_static_page('portfolio_logistics.html', current_page='portfolio')
 @app.route('/portfolio/cloud-migration')
-def portfolio_cloud(): return render_template('portfolio_cloud.html', current_page='portfolio')
+def portfolio_cloud(): return render_static_page('portfolio_cloud.html', current_page='portfolio')
 @app.route('/portfolio/secure-fintech-app')
-def portfolio_fintech(): return render_template('portfolio_fintech.html', current_page='portfolio')
+def portfolio_fintech(): return render_static_page('portfolio_fintech.html', current_page='portfolio')
 @app.route('/portfolio/enterprise-erp')
-def portfolio_erp(): return render_template('portfolio_erp.html', current_page='portfolio')
+def portfolio_erp(): return render_static_page('portfolio_erp.html', current_page='portfolio')
 @app.route('/apply')
-def application_form(): return render_template('application_form.html', current_page='careers')
+def application_form(): return render_static_page('application_form.html', current_page='careers')
 @app.route('/contact-us')
-def contact_page(): return render_template('contact.html', current_page='contact')
+def contact_page(): return render_static_page('contact.html', current_page='contact')
 
 # ==============================================================================
 #  ADMIN PANEL ROUTE
@@ -268,6 +1264,7 @@ def admin_panel():
 #  API & FORM HANDLING
 # ==============================================================================
 @app.route('/api/contact', methods=['POST'])
+@rate_limited('contact')
 def handle_contact():
     form = request.form
     email = form.get('email')
@@ -279,14 +1276,13 @@ def handle_contact():
             email=email, message_content=form.get('message')
         )
         db.session.add(new_message)
+        if app.config.get('MAIL_USERNAME'):
+            enqueue_mail(f"New Contact Form Submission from {form.get('firstName')} {form.get('lastName')}", [app.config['MAIL_RECIPIENT']],
+                         html=render_template('email/contact_notification.html', data=form))
         db.session.commit()
+        notify_mail_worker()
         log_event('CONTACT_SUBMIT', f"Message from {email}")
         
-        if app.config.get('MAIL_USERNAME'):
-            msg = Message(f"New Contact Form Submission from {form.get('firstName')} {form.get('lastName')}", recipients=[app.config['MAIL_RECIPIENT']])
-            msg.html = render_template('email/contact_notification.html', data=form)
-            mail.send(msg)
-        
         session.pop('otp_verified_email', None)
         return jsonify({'message': 'Thank you! Your message has been sent successfully.'})
     except Exception as e:
@@ -295,6 +1291,7 @@ def handle_contact():
         return jsonify({'error': 'An unexpected error occurred.'}), 500
 
 @app.route('/api/detailed-apply', methods=['POST'])
+@rate_limited('apply')
 def handle_apply():
     form = request.form
     files = request.files
@@ -304,27 +1301,19 @@ def handle_apply():
     
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     applicant_name = f"{form.get('firstName')}_{form.get('lastName')}"
+    # The folder name is kept as the application's download namespace; the bytes themselves go to the blob store.
     unique_folder_name = f"{timestamp}_{secure_filename(applicant_name)}"
-    application_dir = os.path.join(app.config['UPLOAD_FOLDER'], unique_folder_name)
-    os.makedirs(application_dir, exist_ok=True)
-    
-    attachments = []
+
+    stored_files = []
     extra_course_cert_filename = None
-    if 'extra_course_cert' in files and files['extra_course_cert'].filename != '':
-        file = files['extra_course_cert']
-        if allowed_file(file.filename):
-            extra_course_cert_filename = secure_filename(file.filename)
-            file.save(os.path.join(application_dir, extra_course_cert_filename))
-            attachments.append({'path': os.path.join(application_dir, extra_course_cert_filename), 'filename': extra_course_cert_filename, 'content_type': file.content_type})
-
-    for field_name in ['resume', 'tenth_cert', 'twelfth_cert', 'ug_cert', 'pg_cert']:
+    for field_name in ['extra_course_cert', 'resume', 'tenth_cert', 'twelfth_cert', 'ug_cert', 'pg_cert']:
         if field_name in files and files[field_name].filename != '':
             file_storage = files[field_name]
             if allowed_file(file_storage.filename):
                 filename = secure_filename(file_storage.filename)
-                file_path = os.path.join(application_dir, filename)
-                file_storage.save(file_path)
-                attachments.append({'path': file_path, 'filename': filename, 'content_type': file_storage.content_type})
+                sha256, size = blob_store.save_stream(file_storage.stream)
+                stored_files.append(ApplicationFile(field_name=field_name, filename=filename, content_type=file_storage.content_type, blob_sha256=sha256, size=size))
+                if field_name == 'extra_course_cert': extra_course_cert_filename = filename
 
     try:
         new_application = Application(
@@ -336,17 +1325,17 @@ def handle_apply():
             extra_course_cert_filename=extra_course_cert_filename
         )
         db.session.add(new_application)
+        for app_file in stored_files:
+            acquire_blob(app_file.blob_sha256, app_file.size)
+            new_application.files.append(app_file)
+        if app.config.get('MAIL_USERNAME'):
+            attachments = [blob_attachment(f, unique_folder_name) for f in stored_files]
+            enqueue_mail(f"New Job Application: {form.get('position')} - {applicant_name}", [app.config['MAIL_RECIPIENT']],
+                         html=render_template('email/application_notification.html', data=form), attachments=attachments)
         db.session.commit()
+        notify_mail_worker()
         log_event('APPLICATION_SUBMIT', f"Application from {email} for {form.get('position')}")
         
-        if app.config.get('MAIL_USERNAME'):
-            msg = Message(f"New Job Application: {form.get('position')} - {applicant_name}", recipients=[app.config['MAIL_RECIPIENT']])
-            msg.html = render_template('email/application_notification.html', data=form)
-            for attachment in attachments:
-                 with app.open_resource(attachment['path']) as fp:
-                    msg.attach(attachment['filename'], attachment['content_type'], fp.read())
-            mail.send(msg)
-        
         session.pop('otp_verified_email', None)
         return jsonify({'message': 'Your application has been submitted successfully.'})
     except Exception as e:
@@ -355,6 +1344,7 @@ def handle_apply():
         return jsonify({'error': 'An unexpected error occurred.'}), 500
 
 @app.route('/api/chatbot', methods=['POST'])
+@rate_limited('chatbot')
 def chatbot_response():
     bot = get_chatbot()
     if not bot:
@@ -367,7 +1357,79 @@ def chatbot_response():
     response = bot.chat(user_message)
     return jsonify(response)
     
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/chatbot/stream', methods=['POST'])
+@rate_limited('chatbot')
+def chatbot_stream():
+    """Same answers as /api/chatbot, delivered as Server-Sent Events (meta, delta..., done) while they are generated."""
+    bot = get_chatbot()
+    user_message = (request.get_json(silent=True) or {}).get('message')
+
+    def events():
+        if not bot:
+            yield sse_event('delta', {'text': 'Sorry, the AI Assistant is currently offline due to a configuration issue.'})
+        elif not user_message:
+            yield sse_event('delta', {'text': 'I need a message to respond to!'})
+        else:
+            for ev in bot.chat_stream(user_message):
+                name = ev.pop('event')
+                yield sse_event(name, ev)
+                if name == 'done': return
+        yield sse_event('done', {})
+
+    return app.response_class(stream_with_context(events()), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/chatbot/cache', methods=['GET'])
+@login_required
+def chatbot_cache_stats():
+    bot = get_chatbot()
+    if not bot or bot.response_cache is None: return jsonify({'backend': 'none'})
+    return jsonify(bot.response_cache.stats())
+
+@app.route('/api/chatbot/llm-status', methods=['GET'])
+@login_required
+def chatbot_llm_status():
+    bot = get_chatbot()
+    if not bot or bot.llm_guard is None: return jsonify({'breaker': 'unavailable'})
+    return jsonify(bot.llm_guard.status())
+
+@app.route('/api/rate-limits', methods=['GET'])
+@login_required
+def rate_limit_status():
+    backend = rate_limiter.backend if rate_limiter is not None else 'none'
+    return jsonify({'backend': backend, 'buckets': rate_limiter.size() if rate_limiter is not None else 0,
+                    'rules': app.config['RATE_LIMITS'], 'stats': rate_limit_stats})
+
+@app.route('/api/event-log/status', methods=['GET'])
+@login_required
+def event_log_status():
+    """This worker's event buffer: events waiting to be written and the enqueued/dropped/flushed/failed counters."""
+    return jsonify({'mode': app.config['EVENT_LOG_MODE'], 'pending': event_sink.pending(),
+                    'capacity': app.config['EVENT_LOG_BUFFER_SIZE'], 'stats': event_sink.counters()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape target: this worker's request, SQL, external-call and event-buffer metrics."""
+    token = app.config['METRICS_TOKEN']
+    scraper = bool(token) and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode())
+    if not (scraper or current_user.is_authenticated):
+        abort(401)
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/chatbot/cache/flush', methods=['POST'])
+@login_required
+def flush_chatbot_cache():
+    bot = get_chatbot()
+    if not bot or bot.response_cache is None: return jsonify({'message': 'Chatbot cache is disabled.'})
+    removed = bot.response_cache.clear()
+    log_event('ADMIN_CHATBOT_CACHE_FLUSH', f"Flushed {removed} cached answers")
+    return jsonify({'message': f'Flushed {removed} cached answers.'})
+
 @app.route('/api/send-otp', methods=['POST'])
+@rate_limited('send_otp')
 def send_otp():
     data = request.get_json()
     email = data.get('email')
@@ -377,15 +1439,17 @@ def send_otp():
     session['otp'], session['otp_email'] = otp, email
     session['otp_expiry'] = (datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat()
     try:
-        msg = Message('Your Vendhan Info Tech Verification Code', recipients=[email])
-        msg.body = f'Your verification code is: {otp}'
-        mail.send(msg)
+        enqueue_mail('Your Vendhan Info Tech Verification Code', [email], body=f'Your verification code is: {otp}')
+        db.session.commit()
+        notify_mail_worker()
         return jsonify({'message': 'Verification code sent.'})
     except Exception as e:
+        db.session.rollback()
         logger.error(f"OTP email failed: {e}")
         return jsonify({'error': 'Could not send email.'}), 500
 
 @app.route('/api/verify-otp', methods=['POST'])
+@rate_limited('verify_otp')
 def verify_otp():
     data = request.get_json()
     if data.get('email') != session.get('otp_email') or data.get('otp') != session.get('otp'):
@@ -402,54 +1466,221 @@ def verify_otp():
 @app.route('/api/dashboard-data', methods=['GET'])
 @login_required
 def get_dashboard_data():
+    row = db.session.get(DashboardStats, 1)
+    if row is None:
+        row = reconcile_dashboard_stats(); db.session.commit()
     stats = {
-        'totalApplications': db.session.scalar(db.select(db.func.count(Application.id))),
-        'totalMessages': db.session.scalar(db.select(db.func.count(ContactMessage.id))),
-        'totalUsers': db.session.scalar(db.select(db.func.count(AdminUser.id))),
-        'totalOpenings': db.session.scalar(db.select(db.func.count(JobOpening.id)).where(JobOpening.is_active==True)),
-        'totalAnnouncements': db.session.scalar(db.select(db.func.count(Announcement.id)).where(Announcement.is_active==True)),
-        'totalPageViews': db.session.scalar(db.select(db.func.count(EventLog.id)).where(EventLog.event_type=='PAGE_VISIT')),
+        'totalApplications': row.applications, 'totalMessages': row.messages, 'totalUsers': row.users,
+        'totalOpenings': row.active_openings, 'totalAnnouncements': row.active_announcements, 'totalPageViews': row.page_views,
     }
     return jsonify({'stats': stats})
 
+@app.route('/api/analytics/traffic', methods=['GET'])
+@login_required
+def get_traffic_series():
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ROLLUP_GRANULARITIES: return jsonify({'error': 'Invalid granularity'}), 400
+    event_type = request.args.get('event_type', 'PAGE_VISIT')
+    path = request.args.get('path')
+    try:
+        default_days = 2 if granularity == 'hour' else 30
+        end = datetime.fromisoformat(request.args['end']) if request.args.get('end') else datetime.now(timezone.utc).replace(tzinfo=None)
+        start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else end - timedelta(days=default_days)
+    except ValueError:
+        return jsonify({'error': 'Dates must be ISO formatted.'}), 400
+
+    query = db.select(TrafficRollup.bucket_start, db.func.sum(TrafficRollup.count)).where(
+        TrafficRollup.granularity == granularity, TrafficRollup.event_type == event_type,
+        TrafficRollup.bucket_start >= bucket_start(start, granularity), TrafficRollup.bucket_start <= end,
+    )
+    if path is not None: query = query.where(TrafficRollup.path == path)
+    rows = db.session.execute(query.group_by(TrafficRollup.bucket_start).order_by(TrafficRollup.bucket_start)).all()
+    series = [{'bucket': bucket.strftime('%Y-%m-%d %H:%M'), 'count': int(count)} for bucket, count in rows]
+
+    top_paths = []
+    if event_type == 'PAGE_VISIT' and path is None:
+        top_query = db.select(TrafficRollup.path, db.func.sum(TrafficRollup.count).label('views')).where(
+            TrafficRollup.granularity == granularity, TrafficRollup.event_type == event_type,
+            TrafficRollup.bucket_start >= bucket_start(start, granularity), TrafficRollup.bucket_start <= end,
+        ).group_by(TrafficRollup.path).order_by(db.desc('views')).limit(10)
+        top_paths = [{'path': p, 'count': int(n)} for p, n in db.session.execute(top_query).all()]
+    return jsonify({'granularity': granularity, 'event_type': event_type, 'series': series, 'topPaths': top_paths})
+
+GENERIC_MODELS = {'jobopening': JobOpening, 'announcement': Announcement, 'eventlog': EventLog, 'application': Application, 'contactmessage': ContactMessage}
+# submission_date and timestamp are shown to the minute, every other datetime to the day
+SERIALIZERS = build_serializers(GENERIC_MODELS.values(), minute_columns=['submission_date', 'timestamp'])
+
 def item_to_dict(item):
-    d = {}
-    for c in item.__table__.columns:
-        val = getattr(item, c.name)
-        if isinstance(val, datetime):
-            if c.name in ['submission_date', 'timestamp']:
-                 d[c.name] = val.strftime('%Y-%m-%d %H:%M')
-            else:
-                 d[c.name] = val.strftime('%Y-%m-%d')
-        else:
-            d[c.name] = val
-    return d
+    return SERIALIZERS[type(item)].dump_object(item)
+GENERIC_ORDER_COLS = {'jobopening': JobOpening.created_at, 'announcement': Announcement.date, 'eventlog': EventLog.timestamp, 'application': Application.submission_date, 'contactmessage': ContactMessage.submission_date}
+GENERIC_FILTERS = {
+    'jobopening': ['is_active'], 'announcement': ['is_active', 'category'], 'eventlog': ['event_type'],
+    'application': ['status', 'position'], 'contactmessage': ['status'],
+}
+GENERIC_PAGE_SIZE, GENERIC_MAX_PAGE_SIZE = 50, 200
+
+def encode_cursor(order_value, item_id):
+    raw = json.dumps([order_value.isoformat() if order_value else None, item_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    order_value, item_id = json.loads(raw)
+    return (datetime.fromisoformat(order_value) if order_value else None), int(item_id)
+
+def parse_date_arg(args, name):
+    value = args.get(name)
+    return datetime.fromisoformat(value) if value else None
+
+def is_date_only(value):
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+def date_range_clauses(column, date_from, date_to):
+    """WHERE clauses for an ISO `from`/`to` range on `column`; a date-only `to` includes that whole day."""
+    clauses = []
+    if date_from: clauses.append(column >= datetime.fromisoformat(date_from))
+    if date_to:
+        upper = datetime.fromisoformat(date_to)
+        clauses.append(column < upper + timedelta(days=1) if is_date_only(date_to) else column <= upper)
+    return clauses
+
+def build_generic_filters(model_name, args):
+    """Translates whitelisted filters and the from/to date range in `args` into WHERE clauses."""
+    model, order_col = GENERIC_MODELS[model_name], GENERIC_ORDER_COLS[model_name]
+    clauses = []
+    for field in GENERIC_FILTERS[model_name]:
+        value = args.get(field)
+        if value is None or value == '': continue
+        if field == 'is_active': value = value.lower() in ['true', '1', 't', 'yes']
+        clauses.append(getattr(model, field) == value)
+    return clauses + date_range_clauses(order_col, args.get('from'), args.get('to'))
 
 @app.route('/api/generic/<model_name>', methods=['GET'])
 @login_required
 def get_all_generic(model_name):
-    models = {'jobopening': JobOpening, 'announcement': Announcement, 'eventlog': EventLog, 'application': Application, 'contactmessage': ContactMessage}
-    order_cols = {'jobopening': JobOpening.created_at, 'announcement': Announcement.date, 'eventlog': EventLog.timestamp, 'application': Application.submission_date, 'contactmessage': ContactMessage.submission_date}
-    if model_name not in models: return jsonify({'error': 'Invalid model'}), 404
-    
-    items = db.session.execute(db.select(models[model_name]).order_by(order_cols[model_name].desc())).scalars().all()
-    return jsonify([item_to_dict(item) for item in items])
+    """
+    Keyset-paginated listing: newest first by the model's date column, with id as tie-breaker.
+    Pass the returned `nextCursor` back as `cursor` to fetch the following page and
+    `include_total=1` to also count every row matching the filters.
+    """
+    if model_name not in GENERIC_MODELS: return jsonify({'error': 'Invalid model'}), 404
+    model, order_col = GENERIC_MODELS[model_name], GENERIC_ORDER_COLS[model_name]
+    try:
+        limit = min(max(int(request.args.get('limit', GENERIC_PAGE_SIZE)), 1), GENERIC_MAX_PAGE_SIZE)
+        clauses = build_generic_filters(model_name, request.args)
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid pagination or filter parameters.'}), 400
+
+    serializer = SERIALIZERS[model]
+    query = db.select(*serializer.columns).where(*clauses)
+    if after:
+        last_value, last_id = after
+        if last_value is None:
+            query = query.where(order_col.is_(None), model.id < last_id)
+        else:
+            query = query.where(db.or_(order_col < last_value, db.and_(order_col == last_value, model.id < last_id), order_col.is_(None)))
+    query = query.order_by(order_col.desc().nulls_last(), model.id.desc()).limit(limit + 1)
+    rows = db.session.execute(query).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(getattr(rows[-1], order_col.key), rows[-1].id) if has_more else None
+    result = {'items': serializer.dump_all(rows), 'nextCursor': next_cursor}
+    if request.args.get('include_total', '').lower() in ['1', 'true']:
+        result['total'] = db.session.scalar(db.select(db.func.count(model.id)).where(*clauses))
+    return jsonify(result)
+
+@app.route('/api/generic/<model_name>/<int:item_id>', methods=['GET'])
+@login_required
+def get_generic(model_name, item_id):
+    if model_name not in GENERIC_MODELS: return jsonify({'error': 'Invalid model'}), 404
+    model = GENERIC_MODELS[model_name]
+    row = db.session.execute(db.select(*SERIALIZERS[model].columns).where(model.id == item_id)).first()
+    if row is None: abort(404)
+    return jsonify(SERIALIZERS[model].dump(row))
+
+def iter_export_rows(model_name, clauses, batch_size=1000):
+    """Yields plain row tuples in id order through a server-side cursor, never materialising the table."""
+    model = GENERIC_MODELS[model_name]
+    query = db.select(*model.__table__.columns).where(*clauses).order_by(model.id)
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        result.close()
+
+@app.route('/api/export/<model_name>', methods=['GET'])
+@login_required
+def export_generic(model_name):
+    """
+    Streams a model as CSV or NDJSON (`format`), optionally gzipped (`gzip=1`), honouring the list filters.
+    `eventlog?archived=1&from=...&to=...` reads compacted events from the archive instead of the table.
+    """
+    if model_name not in GENERIC_MODELS: return jsonify({'error': 'Invalid model'}), 404
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS: return jsonify({'error': 'Invalid format'}), 400
+    compress = request.args.get('gzip', '').lower() in ['1', 'true']
+    archived = model_name == 'eventlog' and request.args.get('archived', '').lower() in ['1', 'true']
+    columns = [c.name for c in GENERIC_MODELS[model_name].__table__.columns]
+    try:
+        if archived:
+            date_from, date_to = parse_date_arg(request.args, 'from'), parse_date_arg(request.args, 'to')
+            if not date_from or not date_to: raise ValueError("from and to are required")
+            events = iter_archived(app.config['EVENT_LOG_ARCHIVE_FOLDER'], date_from.date(), date_to.date(), request.args.get('event_type') or None)
+            rows = ([event.get(c) for c in columns] for event in events)
+        else:
+            rows = iter_export_rows(model_name, build_generic_filters(model_name, request.args))
+    except ValueError:
+        return jsonify({'error': 'Invalid filter parameters.'}), 400
+
+    chunks = encode_rows(columns, rows, fmt, compress)
+    filename = f"{model_name}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.{fmt}" + ('.gz' if compress else '')
+    log_event('ADMIN_EXPORT', f"Exported {model_name} as {fmt}")
+    response = app.response_class(stream_with_context(chunks), mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def reply_rows(owner_column, owner_id):
+    """Replies of one application or message; author names come from the cached admin identities, misses in one query."""
+    query = db.select(AdminReply.reply_content, AdminReply.reply_date, AdminReply.author_id).where(owner_column == owner_id).order_by(AdminReply.id)
+    rows = db.session.execute(query).all()
+    authors = admin_identities(author_id for _, _, author_id in rows)
+    return [{'content': content, 'date': format_minutes(reply_date),
+             'author': authors[author_id].username if authors.get(author_id) else None}
+            for content, reply_date, author_id in rows]
 
 @app.route('/api/application/<int:app_id>', methods=['GET'])
 @login_required
 def get_application_details(app_id):
-    app_obj = db.get_or_404(Application, app_id)
-    app_dir = os.path.join(app.config['UPLOAD_FOLDER'], app_obj.upload_folder)
-    files = []
-    if os.path.exists(app_dir):
-        files = [f for f in os.listdir(app_dir) if os.path.isfile(os.path.join(app_dir, f))]
-    
-    replies = [{'content': r.reply_content, 'date': r.reply_date.strftime('%Y-%m-%d %H:%M'), 'author': r.author.username} for r in app_obj.replies]
+    app_obj = db.session.execute(db.select(
+        Application.id, Application.first_name, Application.last_name, Application.email, Application.phone_number,
+        Application.city, Application.district, Application.position, Application.submission_date, Application.status,
+        Application.upload_folder, Application.extra_course_name, Application.extra_course_cert_filename,
+    ).where(Application.id == app_id)).first()
+    if app_obj is None: abort(404)
+    files = [{'name': name, 'field': field} for name, field in db.session.execute(
+        db.select(ApplicationFile.filename, ApplicationFile.field_name).where(ApplicationFile.application_id == app_id)
+        .order_by(ApplicationFile.id)).all()]
+    if not files:
+        # Applications submitted before the blob store still keep their files in a per-application folder.
+        app_dir = os.path.join(app.config['UPLOAD_FOLDER'], app_obj.upload_folder)
+        if os.path.exists(app_dir):
+            files = [{'name': f, 'field': None} for f in os.listdir(app_dir) if os.path.isfile(os.path.join(app_dir, f))]
+
+    replies = reply_rows(AdminReply.application_id, app_id)
     details = {
         'id': app_obj.id, 'fullName': f"{app_obj.first_name} {app_obj.last_name}",
         'email': app_obj.email, 'phone': app_obj.phone_number,
         'location': f"{app_obj.city}, {app_obj.district}", 'position': app_obj.position,
-        'date': app_obj.submission_date.strftime('%Y-%m-%d'), 'status': app_obj.status,
+        'date': format_day(app_obj.submission_date), 'status': app_obj.status,
         'files': files, 'folder': app_obj.upload_folder, 'replies': replies,
         'extra_course_name': app_obj.extra_course_name,
         'extra_course_cert': app_obj.extra_course_cert_filename
@@ -459,11 +1690,15 @@ def get_application_details(app_id):
 @app.route('/api/message/<int:msg_id>', methods=['GET'])
 @login_required
 def get_message_details(msg_id):
-    msg_obj = db.get_or_404(ContactMessage, msg_id)
-    replies = [{'content': r.reply_content, 'date': r.reply_date.strftime('%Y-%m-%d %H:%M'), 'author': r.author.username} for r in msg_obj.replies]
+    msg_obj = db.session.execute(db.select(
+        ContactMessage.id, ContactMessage.first_name, ContactMessage.last_name, ContactMessage.email,
+        ContactMessage.submission_date, ContactMessage.status, ContactMessage.message_content,
+    ).where(ContactMessage.id == msg_id)).first()
+    if msg_obj is None: abort(404)
+    replies = reply_rows(AdminReply.message_id, msg_id)
     details = {
         'id': msg_obj.id, 'fullName': f"{msg_obj.first_name} {msg_obj.last_name}",
-        'email': msg_obj.email, 'date': msg_obj.submission_date.strftime('%Y-%m-%d'),
+        'email': msg_obj.email, 'date': format_day(msg_obj.submission_date),
         'status': msg_obj.status, 'message': msg_obj.message_content, 'replies': replies
     }
     return jsonify(details)
@@ -537,70 +1772,231 @@ def handle_reply():
             new_reply = AdminReply(reply_content=content, message=item, author_id=current_user.id)
         else: return jsonify({'error': 'Invalid item type.'}), 400
         
-        db.session.add(new_reply); db.session.commit()
+        db.session.add(new_reply); enqueue_mail(subject, [item.email], body=content); db.session.commit()
+        notify_mail_worker()
         log_event(f'ADMIN_REPLY_{item_type.upper()}', f"Replied to ID {item_id}")
-        
-        msg = Message(subject, recipients=[item.email], body=content); mail.send(msg)
         return jsonify({'message': 'Reply sent!'})
     except Exception as e:
         db.session.rollback(); return jsonify({'error': f'Could not send reply: {e}'}), 500
 
+def send_upload(relative_path, download_name, mimetype=None, etag=True):
+    """
+    Sends a file under UPLOAD_FOLDER as an attachment. Served from Python it honours Range and
+    If-None-Match; with DOWNLOAD_OFFLOAD set only headers are produced and the proxy sends the bytes
+    (and handles Range itself), while 304s are still answered here.
+    """
+    path = safe_join(app.config['UPLOAD_FOLDER'], relative_path)
+    if path is None or not os.path.isfile(path): abort(404)
+    offload = app.config['DOWNLOAD_OFFLOAD'] in ('x-accel', 'x-sendfile')
+    response = werkzeug_send_file(path, request.environ, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                                  conditional=not offload, etag=etag, use_x_sendfile=offload, response_class=app.response_class)
+    if not offload:
+        return response
+    response.headers.pop('Content-Length', None)
+    response.make_conditional(request.environ)
+    if response.status_code == 304:
+        response.headers.pop('X-Sendfile', None)
+    elif app.config['DOWNLOAD_OFFLOAD'] == 'x-accel':
+        response.headers.pop('X-Sendfile', None)
+        response.headers['X-Accel-Redirect'] = app.config['DOWNLOAD_ACCEL_PREFIX'] + quote(relative_path.replace(os.sep, '/'))
+    return response
+
 @app.route('/download/<path:folder>/<path:filename>')
 @login_required
 def download_file(folder, filename):
-    return send_from_directory(os.path.join(app.config['UPLOAD_FOLDER'], folder), filename, as_attachment=True)
+    """Sends one application document. Two fields may hold the same filename, so links name the field in `?field=`."""
+    query = db.select(ApplicationFile).join(Application).where(Application.upload_folder == folder, ApplicationFile.filename == filename)
+    if 'field' in request.args:
+        query = query.where(ApplicationFile.field_name == (request.args['field'] or None))
+    app_file = db.session.execute(query.order_by(ApplicationFile.id).limit(1)).scalar_one_or_none()
+    if app_file is not None:
+        # Blobs are content-addressed, so their hash is a ready-made strong ETag.
+        return send_upload(os.path.join(BLOB_SUBDIR, blob_store.relative_path(app_file.blob_sha256)), app_file.filename,
+                           mimetype=app_file.content_type, etag=app_file.blob_sha256)
+    return send_upload(os.path.join(folder, filename), filename)
+
+@app.route('/download/<folder>.zip')
+@login_required
+def download_folder_zip(folder):
+    """Streams every document of one application as a ZIP built on the fly."""
+    application = db.session.execute(db.select(Application).where(Application.upload_folder == folder).limit(1)).scalar_one_or_none()
+    if application is None: abort(404)
+    # Two fields may carry the same filename; the field's folder inside the archive keeps the entries apart.
+    entries = [(f"{f.field_name}/{f.filename}" if f.field_name else f.filename, blob_store.path_for(f.blob_sha256)) for f in application.files]
+    legacy_dir = safe_join(app.config['UPLOAD_FOLDER'], folder)
+    if not entries and legacy_dir and os.path.isdir(legacy_dir):
+        entries = [(name, os.path.join(legacy_dir, name)) for name in sorted(os.listdir(legacy_dir)) if os.path.isfile(os.path.join(legacy_dir, name))]
+    if not entries: abort(404)
+    log_event('ADMIN_DOWNLOAD_ZIP', f"Downloaded documents of {folder}")
+    response = app.response_class(stream_with_context(iter_zip(entries)), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{secure_filename(folder)}.zip"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/item/delete/<item_type>/<int:item_id>', methods=['POST'])
 @login_required
 def delete_item(item_type, item_id):
     try:
+        orphaned, legacy_folder = [], None
         if item_type == 'application':
             item = db.get_or_404(Application, item_id)
-            folder_path = os.path.join(app.config['UPLOAD_FOLDER'], item.upload_folder)
-            if os.path.exists(folder_path): shutil.rmtree(folder_path)
+            shas = [f.blob_sha256 for f in item.files]
+            legacy_folder = os.path.join(app.config['UPLOAD_FOLDER'], item.upload_folder)
         elif item_type == 'message':
             item = db.get_or_404(ContactMessage, item_id)
         else: return jsonify({'error': 'Invalid item type'}), 400
         
-        db.session.delete(item); db.session.commit()
+        db.session.delete(item)
+        if item_type == 'application':
+            # The ApplicationFile rows must be gone before the Blob rows they point at.
+            db.session.flush()
+            orphaned = release_blobs(shas)
+        db.session.commit()
+        purge_blob_files(orphaned)
+        if legacy_folder and os.path.isdir(legacy_folder): shutil.rmtree(legacy_folder)
         log_event(f'ADMIN_DELETE_CONTACT/{item_type.upper()}', f"Deleted ID {item_id}")
         return jsonify({'message': f'{item_type.capitalize()} deleted.'}), 200
     except Exception as e:
-        db.session.rollback(); return jsonify({'error': 'Error during deletion.'}), 500
+        db.session.rollback()
+        logger.error(f"Deleting {item_type} {item_id} failed: {e}")
+        return jsonify({'error': 'Error during deletion.'}), 500
 
 # ==============================================================================
 #  LIVE UPDATES API
 # ==============================================================================
+# Third-party feeds are cached: news is identical for every visitor, weather is keyed by coordinates
+# rounded to ~11 km. Expired entries keep being served while one background refresh replaces them, and
+# an upstream failure is remembered for LIVE_ERROR_TTL seconds so an outage does not hold up every request.
+app.config['OPENWEATHER_API_URL'] = os.getenv('OPENWEATHER_API_URL', 'https://api.openweathermap.org/data/2.5/weather')
+app.config['NEWS_API_URL'] = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2/everything')
+app.config['LIVE_WEATHER_TTL'] = int(os.getenv('LIVE_WEATHER_TTL', 600))
+app.config['LIVE_NEWS_TTL'] = int(os.getenv('LIVE_NEWS_TTL', 900))
+app.config['LIVE_STALE_TTL'] = int(os.getenv('LIVE_STALE_TTL', 3600))
+app.config['LIVE_ERROR_TTL'] = int(os.getenv('LIVE_ERROR_TTL', 30))
+# Coordinates come from anonymous visitors, so the weather cache keeps at most this many locations.
+app.config['LIVE_WEATHER_MAX_LOCATIONS'] = int(os.getenv('LIVE_WEATHER_MAX_LOCATIONS', 1000))
+weather_cache = StaleWhileRevalidateCache(app.config['LIVE_WEATHER_TTL'], app.config['LIVE_STALE_TTL'], app.config['LIVE_ERROR_TTL'],
+                                          max_entries=app.config['LIVE_WEATHER_MAX_LOCATIONS'])
+news_cache = StaleWhileRevalidateCache(app.config['LIVE_NEWS_TTL'], app.config['LIVE_STALE_TTL'], app.config['LIVE_ERROR_TTL'])
+live_update_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='live-updates')
+http_sessions = threading.local()
+
+def http_session(name):
+    """One pooled requests.Session per upstream and thread, so TCP/TLS connections are reused across calls."""
+    sessions = getattr(http_sessions, 'sessions', None)
+    if sessions is None or http_sessions.pid != os.getpid():
+        sessions, http_sessions.pid = {}, os.getpid()
+        http_sessions.sessions = sessions
+    if name not in sessions:
+        import requests
+        import requests.adapters
+        session_obj = requests.Session()
+        session_obj.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        sessions[name] = session_obj
+    return sessions[name]
+
+def valid_coordinates(lat, lon):
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+def fetch_weather(weather_key, lat, lon, timings=None):
+    if lat is not None and lon is not None and not valid_coordinates(lat, lon):
+        raise ValueError(f"Coordinates out of range: {lat}, {lon}")
+    params = {'appid': weather_key, 'units': 'metric'}
+    if lat is not None and lon is not None: params.update(lat=lat, lon=lon)
+    else: params['q'] = 'Oddanchatram,IN'
+    with external_call('openweather', timings):
+        response = http_session('weather').get(app.config['OPENWEATHER_API_URL'], params=params, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def fetch_news(news_key, timings=None):
+    params = {'q': 'technology', 'language': 'en', 'sortBy': 'publishedAt', 'apiKey': news_key, 'pageSize': 10}
+    with external_call('newsapi', timings):
+        response = http_session('news').get(app.config['NEWS_API_URL'], params=params, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def feed_unavailable(name):
+    return {"error": f"{name.capitalize()} data is currently unavailable."}
+
+def fetch_feed(name, cache, key, fetch):
+    """Fetches a cold feed, sharing the upstream call with other requests waiting on the same key."""
+    try:
+        return cache.fetch(key, fetch)
+    except Exception as e:
+        logger.error(f"Could not fetch {name} data: {e}"); return feed_unavailable(name)
+
 @app.route('/api/live-updates')
 def live_updates():
     weather_key = os.getenv('OPENWEATHER_API_KEY')
     news_key = os.getenv('NEWS_API_KEY')
-    weather_data, news_data = None, None
-    lat = request.args.get('lat')
-    lon = request.args.get('lon')
+    lat, lon = None, None
+    try:
+        if request.args.get('lat') and request.args.get('lon'):
+            lat, lon = round(float(request.args['lat']), 1), round(float(request.args['lon']), 1)
+    except ValueError:
+        pass
+    if lat is not None and not valid_coordinates(lat, lon):
+        return jsonify({'error': 'lat must be within [-90, 90] and lon within [-180, 180].'}), 400
 
-    if weather_key:
+    # The pool threads have no request context, so they report upstream time into this request's timings directly.
+    timings = current_timings()
+    feeds = []
+    if weather_key: feeds.append(('weather', weather_cache, ('weather', lat, lon), lambda: fetch_weather(weather_key, lat, lon, timings)))
+    if news_key: feeds.append(('news', news_cache, 'news', lambda: fetch_news(news_key, timings)))
+    data, cold = {'weather': None, 'news': None}, []
+    for name, cache, key, fetch in feeds:
         try:
-            if lat and lon:
-                weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={weather_key}&units=metric"
-            else:
-                weather_url = f"https://api.openweathermap.org/data/2.5/weather?q=Oddanchatram,IN&appid={weather_key}&units=metric"
-            response = requests.get(weather_url, timeout=5)
-            response.raise_for_status()
-            weather_data = response.json()
-        except Exception as e:
-            logger.error(f"Could not fetch weather data: {e}"); weather_data = {"error": "Weather data is currently unavailable."}
-    
-    if news_key:
-        try:
-            news_url = f"https://newsapi.org/v2/everything?q=technology&language=en&sortBy=publishedAt&apiKey={news_key}&pageSize=10"
-            response = requests.get(news_url, timeout=5)
-            response.raise_for_status()
-            news_data = response.json()
-        except Exception as e:
-            logger.error(f"Could not fetch news data: {e}"); news_data = {"error": "News data is currently unavailable."}
-
-    return jsonify({'weather': weather_data, 'news': news_data})
+            value, hit = cache.cached(key, fetch)
+        except Exception:
+            # Failed moments ago (already logged): answer at once instead of waiting on the upstream again.
+            data[name] = feed_unavailable(name); continue
+        if hit: data[name] = value
+        else: cold.append((name, cache, key, fetch))
+
+    # Cache hits never wait. Cold feeds are fetched in parallel: all but the last on the pool, the last on this thread.
+    pending = [(feed[0], live_update_pool.submit(fetch_feed, *feed)) for feed in cold[:-1]]
+    if cold: data[cold[-1][0]] = fetch_feed(*cold[-1])
+    for name, future in pending: data[name] = future.result()
+    return jsonify(data)
+
+
+# ==============================================================================
+#  WORKER WARM-UP
+# ==============================================================================
+WARM_UP_SKIP = ('/api', '/admin', '/logout', '/download', '/metrics')
+
+def warm_up(llm=True):
+    """
+    Compiles every template, renders the public pages (filling page_cache and the content cache), opens a
+    pooled database connection and loads the chatbot's intents, so the first visitors of a fresh worker are
+    not the ones paying for it. Views are called directly, so no page visits are logged. With llm=False the
+    Gemini client (grpc channels and threads, which do not survive fork) is left for the worker to create.
+    """
+    started = time.perf_counter()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    pages = [rule for rule in app.url_map.iter_rules() if 'GET' in rule.methods and not rule.arguments
+             and rule.endpoint != 'static' and not rule.rule.startswith(WARM_UP_SKIP)]
+    for rule in pages:
+        with app.test_request_context(rule.rule):
+            try:
+                app.view_functions[rule.endpoint]()
+            except Exception as e:
+                logger.warning(f"Warm-up of {rule.rule} failed: {e}")
+    bot = get_chatbot()
+    if llm and bot is not None and app.config['WARM_UP_LLM']:
+        bot.llm
+    logger.info(f"Warm-up done in {time.perf_counter() - started:.2f}s ({len(pages)} pages) in process {os.getpid()}")
+
+def dispose_db_pools(close=True):
+    """
+    Drops pooled connections. A preloading master calls it before forking; each worker then calls it with
+    close=False so connections inherited from the master are forgotten without closing the master's sockets.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
 
 
 # ==============================================================================
@@ -0,0 +1,123 @@
+"""
+Benchmark for the admin JSON serialization path.
+
+Compares the original approach (load ORM objects, reflect over __table__.columns with getattr and
+strftime, lazy-load each reply's author) with the compiled RowSerializer and the reply query plus
+batched, cached author lookup now used by app.py. Seeds a scratch SQLite file; run from the SAMPLE directory:
+
+    python benchmarks/bench_serializers.py [--rows 20000] [--details 200] [--replies 5] [--repeat 3]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--rows', type=int, default=20000, help='applications and event log rows each')
+parser.add_argument('--details', type=int, default=200, help='detail views to simulate')
+parser.add_argument('--replies', type=int, default=5, help='replies per application, each by a different admin')
+parser.add_argument('--repeat', type=int, default=3)
+args = parser.parse_args()
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['EVENT_LOG_MODE'] = 'sync'
+
+from sqlalchemy import event  # noqa: E402
+from app import app, db, Application, AdminReply, AdminUser, EventLog, SERIALIZERS, reply_rows  # noqa: E402
+
+
+def legacy_item_to_dict(item):
+    d = {}
+    for c in item.__table__.columns:
+        val = getattr(item, c.name)
+        if isinstance(val, datetime):
+            d[c.name] = val.strftime('%Y-%m-%d %H:%M') if c.name in ['submission_date', 'timestamp'] else val.strftime('%Y-%m-%d')
+        else:
+            d[c.name] = val
+    return d
+
+
+def legacy_list(model):
+    return [legacy_item_to_dict(item) for item in db.session.execute(db.select(model).order_by(model.id)).scalars().all()]
+
+
+def compiled_list(model):
+    serializer = SERIALIZERS[model]
+    return serializer.dump_all(db.session.execute(db.select(*serializer.columns).order_by(model.id)).all())
+
+
+def legacy_replies(app_id):
+    app_obj = db.session.get(Application, app_id)
+    return [{'content': r.reply_content, 'date': r.reply_date.strftime('%Y-%m-%d %H:%M'), 'author': r.author.username}
+            for r in app_obj.replies]
+
+
+def compiled_replies(app_id):
+    return reply_rows(AdminReply.application_id, app_id)
+
+
+def seed():
+    start = datetime(2025, 1, 1)
+    authors = []
+    for i in range(args.replies):
+        user = AdminUser(username=f'admin{i}'); user.set_password('x')
+        authors.append(user)
+    db.session.add_all(authors); db.session.commit()
+    db.session.execute(db.insert(Application), [
+        {'first_name': f'First{i}', 'last_name': f'Last{i}', 'email': f'u{i}@example.com', 'phone_number': '9999999999',
+         'city': 'Chennai', 'district': 'Chennai', 'position': 'Engineer', 'upload_folder': f'app_{i}', 'status': 'New',
+         'submission_date': start + timedelta(minutes=i)} for i in range(args.rows)])
+    db.session.execute(db.insert(EventLog), [
+        {'timestamp': start + timedelta(seconds=i), 'ip_address': '10.0.0.1', 'event_type': 'PAGE_VISIT', 'details': f'Visited: /p{i % 40}'}
+        for i in range(args.rows)])
+    db.session.execute(db.insert(AdminReply), [
+        {'reply_content': 'Thanks for applying', 'reply_date': start, 'application_id': app_id, 'author_id': author.id}
+        for app_id in range(1, args.details + 1) for author in authors])
+    db.session.commit()
+
+
+def timed(fn, *fn_args):
+    samples = []
+    for _ in range(args.repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn(*fn_args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        seed()
+        queries = [0]
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: queries.__setitem__(0, queries[0] + 1))
+
+        print(f"{'listing':<26} {'rows':>7} {'legacy rows/s':>14} {'compiled rows/s':>16} {'speedup':>8}")
+        for model in (Application, EventLog):
+            legacy_s, legacy_out = timed(legacy_list, model)
+            compiled_s, compiled_out = timed(compiled_list, model)
+            assert legacy_out == compiled_out, f"{model.__name__}: outputs differ"
+            n = len(compiled_out)
+            print(f"{model.__name__:<26} {n:>7} {n / legacy_s:>14,.0f} {n / compiled_s:>16,.0f} {legacy_s / compiled_s:>7.1f}x")
+
+        print(f"\n{'reply lists':<26} {'views':>7} {'legacy queries':>14} {'compiled queries':>16} {'speedup':>8}")
+        results = {}
+        for name, fn in (('legacy', legacy_replies), ('compiled', compiled_replies)):
+            db.session.expunge_all()
+            queries[0] = 0
+            start = time.perf_counter()
+            results[name] = [fn(app_id) for app_id in range(1, args.details + 1)]
+            results[name + '_s'], results[name + '_q'] = time.perf_counter() - start, queries[0]
+        assert results['legacy'] == results['compiled'], "reply outputs differ"
+        print(f"{'application replies':<26} {args.details:>7} {results['legacy_q']:>14} {results['compiled_q']:>16} "
+              f"{results['legacy_s'] / results['compiled_s']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Startup benchmark: what a gunicorn worker or a `flask` CLI call pays before it can do anything.
+
+Each run is a fresh interpreter against a scratch SQLite file, so nothing is shared between runs:
+  * an import-time breakdown of `import app` (python -X importtime), grouped by the modules app.py
+    imports directly, with the interpreter's own startup subtracted;
+  * the median time to import app and to serve the first GET / through the test client;
+  * the optional integrations that are still loaded once GET / has been served (they should be
+    imported on first use only).
+
+Run from the SAMPLE directory:
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--max-import-ms N] [--max-first-response-ms N]
+
+Exits with status 1 when a threshold is exceeded or an integration in --lazy is loaded eagerly.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = 'google.generativeai,grpc,requests,flask_mail'
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--runs', type=int, default=5, help='cold starts to time (median is reported)')
+parser.add_argument('--top', type=int, default=15, help='direct imports of app.py to list')
+parser.add_argument('--lazy', default=LAZY_MODULES, help='comma-separated modules that must not be loaded by startup')
+parser.add_argument('--max-import-ms', type=float, help='fail if importing app takes longer (median)')
+parser.add_argument('--max-first-response-ms', type=float, help='fail if import + first GET / takes longer (median)')
+args = parser.parse_args()
+
+FIRST_RESPONSE = """
+import sys, time, json
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+response = app.test_client().get('/')
+served = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'first_response_s': served - imported, 'status': response.status_code,
+                  'loaded': [m for m in sys.argv[1].split(',') if m and m in sys.modules]}))
+"""
+
+CREATE_TABLES = "from app import app, db\nwith app.app_context(): db.create_all()"
+
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run_python(env, *python_args):
+    result = subprocess.run([sys.executable, *python_args], cwd=SAMPLE_DIR, env=env, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"{' '.join(python_args[:2])} failed:\n{result.stderr}")
+    return result
+
+
+def import_breakdown(env):
+    """{module: cumulative µs} for the direct imports of app, plus app's total and the interpreter baseline."""
+    baseline = sum(int(m.group(1)) for m in map(IMPORTTIME.match, run_python(env, '-X', 'importtime', '-c', 'pass').stderr.splitlines()) if m)
+    direct, total = {}, 0
+    for line in run_python(env, '-X', 'importtime', '-c', 'import app').stderr.splitlines():
+        m = IMPORTTIME.match(line)
+        if not m:
+            continue
+        cumulative_us, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        if name == 'app' and indent == 1:
+            total = cumulative_us
+        elif indent == 3:
+            direct[name] = direct.get(name, 0) + cumulative_us
+    return direct, total, baseline
+
+
+def main():
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+               EVENT_LOG_MODE='sync')
+    run_python(env, '-c', CREATE_TABLES)
+
+    direct, total, baseline = import_breakdown(env)
+    print(f"import app: {total / 1000:.1f} ms (interpreter startup, not included: {baseline / 1000:.1f} ms)\n")
+    print(f"{'direct import':<32} {'cumulative ms':>14} {'share':>7}")
+    for name, us in sorted(direct.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32} {us / 1000:>14.1f} {us / max(total, 1):>7.1%}")
+
+    runs = [json.loads(run_python(env, '-c', FIRST_RESPONSE, args.lazy).stdout.strip().splitlines()[-1]) for _ in range(args.runs)]
+    import_ms = statistics.median(r['import_s'] for r in runs) * 1000
+    response_ms = statistics.median(r['first_response_s'] for r in runs) * 1000
+    loaded = sorted({m for r in runs for m in r['loaded']})
+    print(f"\n{'cold start (median of ' + str(args.runs) + ')':<32} {'ms':>14}")
+    print(f"{'import app':<32} {import_ms:>14.1f}")
+    print(f"{'first GET / (status ' + str(runs[0]['status']) + ')':<32} {response_ms:>14.1f}")
+    print(f"{'time to first response':<32} {import_ms + response_ms:>14.1f}")
+    print(f"\neagerly loaded integrations: {', '.join(loaded) or 'none'}")
+
+    failures = []
+    if loaded:
+        failures.append(f"loaded at startup: {', '.join(loaded)}")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import app took {import_ms:.1f} ms > {args.max_import_ms} ms")
+    if args.max_first_response_ms is not None and import_ms + response_ms > args.max_first_response_ms:
+        failures.append(f"first response after {import_ms + response_ms:.1f} ms > {args.max_first_response_ms} ms")
+    if failures:
+        sys.exit('FAIL: ' + '; '.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# blob_store.py
+
+import os
+import hashlib
+import tempfile
+from typing import BinaryIO, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """
+    Content-addressed file store. Each blob lives at <root>/<sha[:2]>/<sha[2:4]>/<sha>, so saving
+    identical content twice keeps a single copy on disk. Reference counting is left to the caller.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def relative_path(self, sha256: str) -> str:
+        return os.path.join(sha256[:2], sha256[2:4], sha256)
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, self.relative_path(sha256))
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.isfile(self.path_for(sha256))
+
+    def save_stream(self, stream: BinaryIO) -> Tuple[str, int]:
+        """Copies `stream` to disk while hashing it in a single pass. Returns (sha256, size)."""
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            final_path = self.path_for(sha256)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return sha256, size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, sha256: str):
+        try:
+            os.remove(self.path_for(sha256))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,89 @@
+# content_cache.py
+
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class VersionedContentCache:
+    """
+    Per-process cache for read-mostly models, validated against version stamps kept in the database.
+    Writers bump a model's version in the same transaction as the change; readers fetch all versions
+    with one small query at most every `check_interval` seconds, so other workers see a change within
+    that window and the worker that committed it sees it immediately (see `invalidate`).
+    """
+
+    def __init__(self, load_versions: Callable[[], Dict[str, int]], check_interval: float = 2.0):
+        self.load_versions = load_versions
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._checked_at = None
+        self._entries: Dict[str, Tuple[Tuple, Any, float]] = {}
+        self.hits = self.misses = self.version_checks = 0
+
+    def versions(self) -> Dict[str, int]:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            versions = self.load_versions()
+            with self._lock:
+                self._versions, self._checked_at = versions, now
+                self.version_checks += 1
+        return self._versions
+
+    def get(self, key: str, models: Iterable[str], load: Callable[[], Any], ttl: Optional[float] = None):
+        """
+        Returns the value cached under `key` while the versions of `models` are unchanged (and, with
+        `ttl`, for at most that many seconds), else `load()`.
+        """
+        versions = self.versions()
+        stamp = tuple(versions.get(model, 0) for model in models)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp and (ttl is None or time.monotonic() - entry[2] < ttl):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = load()
+        with self._lock:
+            self._entries[key] = (stamp, value, time.monotonic())
+        return value
+
+    def get_many(self, keys: Iterable[str], models: Iterable[str], load: Callable[[list], Dict[str, Any]],
+                 ttl: Optional[float] = None) -> Dict[str, Any]:
+        """
+        `get` for several keys under the same `models`: one `load(missing_keys)` call returns {key: value}
+        for every key not cached; keys it leaves out are cached as None.
+        """
+        versions = self.versions()
+        stamp = tuple(versions.get(model, 0) for model in models)
+        now = time.monotonic()
+        found, missing = {}, []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp and (ttl is None or now - entry[2] < ttl):
+                found[key] = entry[1]
+            else:
+                missing.append(key)
+        self.hits += len(found)
+        if missing:
+            self.misses += len(missing)
+            loaded = load(missing)
+            with self._lock:
+                for key in missing:
+                    found[key] = loaded.get(key)
+                    self._entries[key] = (stamp, found[key], time.monotonic())
+        return found
+
+    def invalidate(self):
+        """Forces the next read to re-check versions; called after this process commits a content change."""
+        with self._lock:
+            self._checked_at = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = None
+
+    def stats(self) -> Dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'version_checks': self.version_checks, 'versions': dict(self._versions)}
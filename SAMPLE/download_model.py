@@ -2,9 +2,15 @@
 
 import os
 import datetime
-from typing import Dict, Optional, Tuple
-import re
-import google.generativeai as genai # --- NEW: Import Google's library
+import threading
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from intent_engine import IntentEngine
+from llm_guard import CircuitOpenError
+from response_cache import normalize_key
+
+DEFAULT_INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chatbot_intents.json')
 
 # --- NEW: This is the context we will feed the LLM so it knows about YOUR website ---
 VENDHAN_INFO_TECH_CONTEXT = """
@@ -24,43 +30,61 @@ Key information about Vendhan Info Tech:
 - How to Contact: Users should use the form on the "Contact" section of the website. The direct link is #contact.
 """
 
+OFFLINE_MESSAGE = "I apologize, but my advanced AI capabilities are currently offline. I can still help with questions about careers or contact information."
+CONNECTION_ERROR_MESSAGE = "I seem to be having trouble connecting to my advanced knowledge base. Please try again in a moment."
+TECHNICAL_ISSUE_MESSAGE = "I apologize, but I've encountered a technical issue. Please try again in a moment."
+# Add a small disclaimer for user safety and transparency
+AI_DISCLAIMER = "<br><br><small><i>This response is AI-generated.</i></small>"
+
 class VendhanInfoTechChatbot:
-    def __init__(self):
+    def __init__(self, response_cache=None, llm_guard=None, timer=None):
         """
         Initializes the Hybrid Chatbot.
         It configures the Google Gemini API and sets up the rule-based knowledge.
+        `response_cache` (see response_cache.py) stores Expert Lane answers for repeated questions and
+        `llm_guard` (see llm_guard.py) adds deadlines, a concurrency limit, coalescing and a circuit breaker.
+        `timer(service)` returns a context manager wrapped around every Gemini call, for instrumentation.
         """
         self.conversation_history = []
+        self.response_cache = response_cache
+        self.llm_guard = llm_guard
+        self.timer = timer or (lambda service: nullcontext())
 
         # --- NEW: Configure the Google Gemini API ---
-        try:
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                print("⚠️ WARNING: GOOGLE_API_KEY not found. The advanced chatbot features will be disabled.")
-                self.llm = None
-            else:
-                genai.configure(api_key=api_key)
-                self.llm = genai.GenerativeModel('gemini-1.5-flash-latest')
-                print("✅ Google Gemini Pro model initialized successfully.")
-        except Exception as e:
-            print(f"❌ ERROR: Failed to initialize Google Gemini Pro: {e}")
-            self.llm = None
-
-        # This is our "Fast Lane" knowledge base for quick, specific answers
-        self.rule_based_knowledge = {
-            'careers': "That's fantastic! We are always looking for passionate and talented people to join our mission. You can fill out the application form and upload your resume directly on our careers page.<br><br><a href=\"#careers\" class=\"chat-link\">Go to the Careers Section</a>",
-            'contact': "We'd love to hear from you! The best way to discuss your project is by filling out our contact form.<br><br><a href=\"#contact\" class=\"chat-link\">Go to the Contact Section</a>",
-            'greeting': "Hello! I'm the Vendhan AI Assistant. I can tell you about our company or answer general questions. How can I help?",
-            'goodbye': "Thank you for chatting with me! If you have any more questions, feel free to ask. Have a great day!",
-        }
-        
-        # Keywords for the "Fast Lane"
-        self.intent_patterns = {
-            'careers': [r'\b(apply|join|career|job|position|hiring|work for you|link to apply|employment)\b'],
-            'contact': [r'\b(contact|reach|phone|email|address|details|talk to someone|speak with)\b'],
-            'greeting': [r'\b(hello|hi|hey|good morning|yo)\b'],
-            'goodbye': [r'\b(bye|goodbye|see you|thanks|thank you|that is all|ok thanks)\b']
-        }
+        # The SDK (grpc, protobuf, ...) is imported on the first Expert Lane call, not here: see `llm`.
+        self.api_key = os.getenv("GOOGLE_API_KEY")
+        self._llm = None
+        self._llm_lock = threading.Lock()
+        if not self.api_key:
+            print("⚠️ WARNING: GOOGLE_API_KEY not found. The advanced chatbot features will be disabled.")
+
+        # This is our "Fast Lane": intents, their keyword patterns and canned answers live in
+        # chatbot_intents.json and are reloaded automatically when the file changes.
+        self.intent_engine = IntentEngine(os.getenv("CHATBOT_INTENTS_PATH", DEFAULT_INTENTS_PATH))
+
+    @property
+    def llm(self):
+        """The Gemini model, or None when it is not configured or failed to load. Built on first use."""
+        if self._llm is None and self.api_key:
+            with self._llm_lock:
+                if self._llm is None and self.api_key:
+                    try:
+                        import google.generativeai as genai
+                        genai.configure(api_key=self.api_key)
+                        self._llm = genai.GenerativeModel('gemini-1.5-flash-latest')
+                        print("✅ Google Gemini Pro model initialized successfully.")
+                    except Exception as e:
+                        print(f"❌ ERROR: Failed to initialize Google Gemini Pro: {e}")
+                        self.api_key = None
+        return self._llm
+
+    @property
+    def rule_based_knowledge(self) -> Dict[str, str]:
+        return {intent: spec.get('response') for intent, spec in self.intent_engine.intents.items() if spec.get('response')}
+
+    @property
+    def intent_patterns(self) -> Dict[str, List[str]]:
+        return {intent: spec.get('patterns', []) for intent, spec in self.intent_engine.intents.items()}
         
     def load_model(self):
         # This function is now just for confirmation.
@@ -69,12 +93,11 @@ class VendhanInfoTechChatbot:
 
     def detect_rule_based_intent(self, message: str) -> Optional[str]:
         """Checks if the message matches a simple, fast-lane rule."""
-        message_lower = message.lower()
-        for intent, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    return intent
-        return None
+        return self.intent_engine.best(message)
+
+    def match_intents(self, message: str) -> List[Tuple[str, float]]:
+        """Every fast-lane intent the message matches, with its score, best first."""
+        return self.intent_engine.match(message)
 
     # --- NEW: This function calls the Google Gemini API ---
     def query_llm(self, user_message: str) -> str:
@@ -83,19 +106,69 @@ class VendhanInfoTechChatbot:
         This is the "Expert Lane".
         """
         if not self.llm:
-            return "I apologize, but my advanced AI capabilities are currently offline. I can still help with questions about careers or contact information."
+            return OFFLINE_MESSAGE
 
-        # Combine our website context with the user's question
-        prompt = VENDHAN_INFO_TECH_CONTEXT + f"\n\nUser Question: \"{user_message}\"\n\nAnswer:"
-        
+        if self.response_cache is not None:
+            cached = self.response_cache.get(user_message)
+            if cached is not None:
+                return cached
+
+        prompt = self.build_prompt(user_message)
         try:
-            response = self.llm.generate_content(prompt)
-            # Add a small disclaimer for user safety and transparency
-            disclaimer = "<br><br><small><i>This response is AI-generated.</i></small>"
-            return response.text + disclaimer
+            with self.timer('gemini'):
+                if self.llm_guard is not None:
+                    # Identical in-flight questions share one upstream call.
+                    answer = self.llm_guard.call(normalize_key(user_message), lambda: self.llm.generate_content(prompt).text + AI_DISCLAIMER)
+                else:
+                    answer = self.llm.generate_content(prompt).text + AI_DISCLAIMER
+            # Only successful answers are cached; errors should be retried on the next ask.
+            if self.response_cache is not None:
+                self.response_cache.set(user_message, answer)
+            return answer
+        except CircuitOpenError:
+            return OFFLINE_MESSAGE
         except Exception as e:
             print(f"❌ ERROR during Gemini API call: {e}")
-            return "I seem to be having trouble connecting to my advanced knowledge base. Please try again in a moment."
+            return CONNECTION_ERROR_MESSAGE
+
+    def build_prompt(self, user_message: str) -> str:
+        # Combine our website context with the user's question
+        return VENDHAN_INFO_TECH_CONTEXT + f"\n\nUser Question: \"{user_message}\"\n\nAnswer:"
+
+    def stream_llm(self, user_message: str) -> Iterator[str]:
+        """
+        Streaming variant of query_llm: yields text as Gemini produces it, so the first words
+        reach the visitor long before the full answer is ready.
+        """
+        if not self.llm:
+            yield OFFLINE_MESSAGE
+            return
+
+        if self.response_cache is not None:
+            cached = self.response_cache.get(user_message)
+            if cached is not None:
+                yield cached
+                return
+
+        prompt = self.build_prompt(user_message)
+        texts = lambda: (chunk.text for chunk in self.llm.generate_content(prompt, stream=True))
+        parts = []
+        try:
+            with self.timer('gemini'):
+                for text in (self.llm_guard.stream(texts) if self.llm_guard is not None else texts()):
+                    if text:
+                        parts.append(text)
+                        yield text
+        except CircuitOpenError:
+            yield ("<br><br>" if parts else "") + OFFLINE_MESSAGE
+            return
+        except Exception as e:
+            print(f"❌ ERROR during Gemini streaming call: {e}")
+            yield ("<br><br>" if parts else "") + CONNECTION_ERROR_MESSAGE
+            return
+        yield AI_DISCLAIMER
+        if self.response_cache is not None and parts:
+            self.response_cache.set(user_message, ''.join(parts) + AI_DISCLAIMER)
 
     def chat(self, user_message: str) -> Dict:
         """
@@ -105,9 +178,9 @@ class VendhanInfoTechChatbot:
             # 1. Check the "Fast Lane" first
             intent = self.detect_rule_based_intent(user_message)
             
-            if intent and intent in self.rule_based_knowledge:
+            if intent and self.intent_engine.response_for(intent):
                 # If we find a quick rule, use it and we're done.
-                response_content = self.rule_based_knowledge[intent]
+                response_content = self.intent_engine.response_for(intent)
                 confidence = 0.99
             else:
                 # 2. If no rule matches, use the "Expert Lane" (LLM)
@@ -125,9 +198,29 @@ class VendhanInfoTechChatbot:
         except Exception as e:
             print(f"❌ ERROR in chat method: {e}")
             return {
-                'response': "I apologize, but I've encountered a technical issue. Please try again in a moment.",
+                'response': TECHNICAL_ISSUE_MESSAGE,
                 'intent': 'error', 'confidence': 0.0, 'timestamp': datetime.datetime.now().isoformat()
             }
 
-def create_enhanced_chatbot():
-    return VendhanInfoTechChatbot()
\ No newline at end of file
+    def chat_stream(self, user_message: str) -> Iterator[Dict]:
+        """
+        Streaming counterpart of chat(). Yields protocol events: one 'meta' event with the intent,
+        'delta' events carrying text, and a final 'done' event. Fast-lane answers arrive as a single delta.
+        """
+        try:
+            intent = self.detect_rule_based_intent(user_message)
+            if intent and self.intent_engine.response_for(intent):
+                yield {'event': 'meta', 'intent': intent, 'confidence': 0.99}
+                yield {'event': 'delta', 'text': self.intent_engine.response_for(intent)}
+            else:
+                print(f"No rule found for '{user_message}'. Escalating to Gemini Pro (streaming)...")
+                yield {'event': 'meta', 'intent': 'llm_query', 'confidence': 0.85}
+                for text in self.stream_llm(user_message):
+                    yield {'event': 'delta', 'text': text}
+        except Exception as e:
+            print(f"❌ ERROR in chat_stream method: {e}")
+            yield {'event': 'delta', 'text': TECHNICAL_ISSUE_MESSAGE}
+        yield {'event': 'done', 'timestamp': datetime.datetime.now().isoformat()}
+
+def create_enhanced_chatbot(response_cache=None, llm_guard=None, timer=None):
+    return VendhanInfoTechChatbot(response_cache=response_cache, llm_guard=llm_guard, timer=timer)
\ No newline at end of file
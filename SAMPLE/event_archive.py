@@ -0,0 +1,88 @@
+# event_archive.py
+
+import os
+import re
+import gzip
+import json
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from export_stream import encode_rows
+
+# <root>/YYYY/MM/events-YYYY-MM-DD-<first id>-<last id>.ndjson.gz; one part per compaction run and day
+PART_NAME = re.compile(r'^events-(\d{4}-\d{2}-\d{2})-(\d+)-(\d+)\.ndjson\.gz$')
+
+
+def day_folder(root: str, day: date) -> str:
+    return os.path.join(root, f'{day:%Y}', f'{day:%m}')
+
+
+def day_parts(root: str, day: date) -> List[Tuple[int, int, str]]:
+    """(first_id, last_id, path) of every archived part for `day`, oldest first."""
+    folder = day_folder(root, day)
+    if not os.path.isdir(folder):
+        return []
+    parts = []
+    for name in os.listdir(folder):
+        m = PART_NAME.match(name)
+        if m and m.group(1) == day.isoformat():
+            parts.append((int(m.group(2)), int(m.group(3)), os.path.join(folder, name)))
+    return sorted(parts)
+
+
+def write_part(root: str, day: date, columns: List[str], rows: Iterable[Sequence]) -> Optional[Tuple[str, int, int, int]]:
+    """
+    Writes `rows` (ordered by id, `id` being the first column) as one gzip NDJSON part for `day`.
+    The file only appears under its final name once complete and fsynced, so a crash never leaves a
+    truncated part behind. Returns (path, first_id, last_id, count), or None when there were no rows.
+    """
+    folder = day_folder(root, day)
+    os.makedirs(folder, exist_ok=True)
+    seen = {'first': None, 'last': None, 'count': 0}
+
+    def tracked():
+        for row in rows:
+            if seen['first'] is None: seen['first'] = row[0]
+            seen['last'] = row[0]
+            seen['count'] += 1
+            yield row
+
+    tmp_path = os.path.join(folder, f'.events-{day.isoformat()}-{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as fp:
+        for chunk in encode_rows(columns, tracked(), 'ndjson', compress=True, rows_per_chunk=1000):
+            fp.write(chunk)
+        fp.flush()
+        os.fsync(fp.fileno())
+    if not seen['count']:
+        os.remove(tmp_path)
+        return None
+    path = os.path.join(folder, f"events-{day.isoformat()}-{seen['first']}-{seen['last']}.ndjson.gz")
+    os.replace(tmp_path, path)
+    return path, seen['first'], seen['last'], seen['count']
+
+
+def iter_archived(root: str, date_from: date, date_to: date, event_type: Optional[str] = None) -> Iterator[Dict]:
+    """Yields archived events (as dicts) from every day in [date_from, date_to], in day then id order."""
+    day = date_from
+    while day <= date_to:
+        for _, _, path in day_parts(root, day):
+            with gzip.open(path, 'rt', encoding='utf-8') as fp:
+                for line in fp:
+                    event = json.loads(line)
+                    if event_type is None or event.get('event_type') == event_type:
+                        yield event
+        day += timedelta(days=1)
+
+
+def archived_days(root: str) -> List[date]:
+    """Every day that has at least one archived part."""
+    days = set()
+    for folder, _, names in os.walk(root):
+        for name in names:
+            m = PART_NAME.match(name)
+            if m: days.add(date.fromisoformat(m.group(1)))
+    return sorted(days)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
@@ -0,0 +1,141 @@
+# event_sink.py
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedEventSink:
+    """
+    In-process buffer for analytics events.
+    Events are put on a bounded queue and a background thread hands them to
+    `flush_fn` in batches, either when `batch_size` events are waiting or when
+    `flush_interval` seconds have passed. When the queue is full new events are
+    dropped and counted instead of blocking the request; a warning with the number
+    dropped is logged at most once per `drop_warning_interval` seconds.
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Dict]], None], max_size: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 2.0, drop_warning_interval: float = 60.0):
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.drop_warning_interval = drop_warning_interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self.stats = {'enqueued': 0, 'dropped': 0, 'flushed': 0, 'failed': 0, 'batches': 0}
+        self._dropped_since_warning = 0
+        self._last_drop_warning = float('-inf')
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        # The flusher is started lazily (and restarted after a fork) so that a
+        # pre-loaded gunicorn master never owns the thread its workers rely on.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='event-sink-flusher', daemon=True)
+            self._thread.start()
+
+    def emit(self, event: Dict) -> bool:
+        """Queues an event without blocking. Returns False if it was dropped."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+            self._count('enqueued')
+            return True
+        except queue.Full:
+            self._warn_dropped()
+            return False
+
+    def _count(self, name: str, n: int = 1):
+        # Request threads and the flusher both update the counters; `+=` on a dict item is not atomic.
+        with self._lock:
+            self.stats[name] += n
+
+    def _warn_dropped(self):
+        with self._lock:
+            self.stats['dropped'] += 1
+            self._dropped_since_warning += 1
+            now = time.monotonic()
+            if now - self._last_drop_warning < self.drop_warning_interval:
+                return
+            dropped, self._dropped_since_warning, self._last_drop_warning = self._dropped_since_warning, 0, now
+        logger.warning(f"Event buffer full ({self._queue.maxsize} events): dropped {dropped} event(s) since the last warning, "
+                       f"{self.stats['dropped']} in total")
+
+    def _drain(self, first: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
+        limit = limit or self.batch_size
+        batch = [first] if first is not None else []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            self.flush_fn(batch)
+            self._count('flushed', len(batch))
+            self._count('batches')
+        except Exception as e:
+            self._count('failed', len(batch))
+            logger.error(f"Error flushing {len(batch)} buffered events: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stopping.is_set():
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.extend(self._drain(self._queue.get(timeout=timeout), self.batch_size - len(batch)))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self._write(batch)
+
+    def flush(self):
+        """Synchronously writes everything currently buffered, including a batch the flusher is holding."""
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            self._write(batch)
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        self._stopping.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def counters(self) -> Dict[str, int]:
+        """A consistent copy of `stats`."""
+        with self._lock:
+            return dict(self.stats)
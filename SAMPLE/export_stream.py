@@ -0,0 +1,68 @@
+# export_stream.py
+
+import io
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Sequence
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(columns: List[str], rows: Iterable[Sequence], rows_per_chunk: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_plain(v) for v in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(columns: List[str], rows: Iterable[Sequence], rows_per_chunk: int) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False))
+        if len(lines) >= rows_per_chunk:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_rows(columns: List[str], rows: Iterable[Sequence], fmt: str = 'csv',
+                compress: bool = False, rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """
+    Lazily encodes row tuples as CSV or NDJSON, optionally gzip-compressed.
+    Only one chunk of `rows_per_chunk` rows is held in memory at a time.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    encoder = _encode_csv if fmt == 'csv' else _encode_ndjson
+    chunks = encoder(columns, rows, rows_per_chunk)
+    return _gzip(chunks) if compress else chunks
@@ -0,0 +1,68 @@
+# gunicorn.conf.py
+#
+# Production profile, picked up automatically when gunicorn is started from this directory:
+#
+#     gunicorn app:app
+#
+# With preload_app the master imports and warms the app before forking, so it only warms fork-safe state
+# (templates, page and content caches, the chatbot's intents); the Gemini client, whose grpc channels and
+# threads do not survive fork, is created in each worker by post_worker_init.
+#
+# Every value can be overridden with the environment variables below (or on the command line).
+
+import os
+import multiprocessing
+
+# Production runs behind one reverse proxy (Render's router), so trust its X-Forwarded-For entry unless told
+# otherwise. Set TRUSTED_PROXY_HOPS=0 when clients reach gunicorn directly. Read by app.py when it is imported.
+os.environ.setdefault('TRUSTED_PROXY_HOPS', '1')
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5003')}")
+
+# Threaded workers: requests spend most of their time waiting on the database, SMTP or Gemini, so a few
+# processes with several threads each serve more concurrent visitors than the same memory in sync workers.
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# The app is imported and warmed up once in the master and shared copy-on-write by the workers.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ['true', '1', 't']
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then (jittered so they do not all restart together) to cap slow memory growth.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Per worker, the database pool should cover `threads` (DB_POOL_SIZE + DB_MAX_OVERFLOW >= GUNICORN_THREADS),
+# and workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay below the server's connection limit.
+warm_up_workers = os.getenv('WARM_UP', 'true').lower() in ['true', '1', 't']
+
+
+def when_ready(server):
+    """Master, before any worker is forked: warm the fork-safe parts of the preloaded app, then close its connections."""
+    if not server.cfg.preload_app:
+        return
+    from app import warm_up, dispose_db_pools
+    if warm_up_workers:
+        warm_up(llm=False)
+    dispose_db_pools()
+
+
+def post_fork(server, worker):
+    """A child must never use a connection it inherited: forget them without closing the parent's sockets."""
+    if server.cfg.preload_app:
+        from app import dispose_db_pools
+        dispose_db_pools(close=False)
+
+
+def post_worker_init(worker):
+    """Runs in the worker before it accepts connections: opens its own pool connection, fills its caches and creates the LLM client."""
+    if warm_up_workers:
+        from app import warm_up
+        warm_up()
@@ -0,0 +1,114 @@
+# intent_engine.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Patterns that are just a word-bounded list of literal keywords, e.g. \b(apply|join|work for you)\b
+KEYWORD_PATTERN = re.compile(r'^\\b\((?:\?:)?([\w\s|]+)\)\\b$')
+WORD = re.compile(r'\w+')
+
+
+class IntentEngine:
+    """
+    Fast-lane intent matcher.
+    Keyword-list patterns (the common case) are flattened into one phrase table, so a message is
+    tokenised once and each word n-gram is a dict lookup, independent of how many intents exist.
+    Any other regex is compiled on its own and searched separately: in one combined alternation a match
+    consumes its text, so an intent whose pattern overlaps another's would never be seen. Each intent
+    scores its weight once per distinct keyword matched ("apply for a job" beats a bare "hi");
+    ties go to the intent listed first.
+
+    Intents are loaded from a JSON file of the form
+        {"intents": {"careers": {"patterns": ["\\\\b(apply|job)\\\\b"], "response": "...", "weight": 1.0}}}
+    which is re-read when its modification time changes (checked at most every `reload_interval` seconds).
+    """
+
+    def __init__(self, path: Optional[str] = None, intents: Optional[Dict] = None, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.intents: Dict[str, Dict] = {}
+        # (phrases, max_phrase_words, [(regex, intent, weight)], {intent: position}) is swapped
+        # as one tuple so concurrent readers never see a half-loaded set
+        self._compiled = ({}, 0, [], {})
+        if intents is not None:
+            self.load(intents)
+        elif path:
+            self.reload(force=True)
+
+    def load(self, intents: Dict):
+        """Compiles an {intent: {'patterns': [...], 'response': ..., 'weight': ...}} mapping."""
+        phrases, max_words, regexes = {}, 0, []
+        for intent, spec in intents.items():
+            weight = float(spec.get('weight', 1.0))
+            for pattern in spec.get('patterns', []):
+                compiled = re.compile(pattern, re.IGNORECASE)  # fails fast with the offending pattern in the traceback
+                keywords = KEYWORD_PATTERN.match(pattern)
+                if keywords:
+                    for keyword in keywords.group(1).split('|'):
+                        words = WORD.findall(keyword.lower())
+                        if not words: continue
+                        phrases.setdefault(' '.join(words), []).append((intent, weight))
+                        max_words = max(max_words, len(words))
+                    continue
+                regexes.append((compiled, intent, weight))
+        with self._lock:
+            self._compiled = (phrases, max_words, regexes, {intent: i for i, intent in enumerate(intents)})
+            self.intents = intents
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-reads the config file if it changed. A broken file is logged and the previous intents are kept."""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+            if not force and mtime == self._mtime:
+                return False
+            with open(self.path, encoding='utf-8') as fp:
+                self.load(json.load(fp)['intents'])
+            self._mtime = mtime
+            logger.info(f"Loaded {len(self.intents)} chatbot intents from {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Could not load chatbot intents from {self.path}: {e}")
+            return False
+
+    def match(self, message: str) -> List[Tuple[str, float]]:
+        """Returns every matched intent as (intent, score), best first."""
+        self.reload()
+        phrases, max_words, regexes, order = self._compiled
+        hits = set()
+        if phrases:
+            tokens = WORD.findall(message.lower())
+            for i in range(len(tokens)):
+                for n in range(1, min(max_words, len(tokens) - i) + 1):
+                    phrase = ' '.join(tokens[i:i + n])
+                    for intent, weight in phrases.get(phrase, ()):
+                        hits.add((intent, weight, phrase))
+        for regex, intent, weight in regexes:
+            for m in regex.finditer(message):
+                hits.add((intent, weight, m.group().lower()))
+        scores: Dict[str, float] = {}
+        for intent, weight, _ in hits:
+            scores[intent] = scores.get(intent, 0.0) + weight
+        return sorted(scores.items(), key=lambda item: (-item[1], order[item[0]]))
+
+    def best(self, message: str) -> Optional[str]:
+        matches = self.match(message)
+        return matches[0][0] if matches else None
+
+    def response_for(self, intent: str) -> Optional[str]:
+        return self.intents.get(intent, {}).get('response')
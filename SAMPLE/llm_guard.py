@@ -0,0 +1,216 @@
+# llm_guard.py
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+class LLMUnavailableError(Exception):
+    """Base class for calls the guard refused or abandoned."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    pass
+
+
+class LLMBusyError(LLMUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_timeout`
+    seconds. After that a single trial call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() - self._opened_at >= self.reset_timeout else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures, self._opened_at, self._trial_in_flight = 0, None, False
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution whose result (or error) they all share."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable):
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+class LLMGuard:
+    """
+    Wraps upstream LLM calls with a per-call deadline, a concurrency limit, single-flight
+    coalescing of identical questions and a circuit breaker. Calls run on a small thread pool
+    so a stalled upstream costs a pool slot, not the web worker that asked.
+    """
+
+    def __init__(self, timeout: float = 20.0, max_concurrency: int = 4, breaker: Optional[CircuitBreaker] = None):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self.single_flight = SingleFlight()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self.stats = {'calls': 0, 'timeouts': 0, 'rejected_open': 0, 'rejected_busy': 0, 'errors': 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created lazily and again after a fork: worker threads do not survive into child processes.
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm-call')
+                    self._executor_pid = os.getpid()
+                    self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        return self._executor
+
+    def _admit(self):
+        if not self.breaker.allow():
+            self.stats['rejected_open'] += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+        pool = self._pool()
+        if not self._slots.acquire(timeout=min(self.timeout, 2.0)):
+            self.stats['rejected_busy'] += 1
+            # Not the upstream's fault: the breaker is not charged, but a half-open trial slot is handed back.
+            self.breaker.release_trial()
+            raise LLMBusyError("Too many LLM calls in flight")
+        self.stats['calls'] += 1
+        return pool
+
+    def _run(self, fn: Callable):
+        pool = self._admit()
+
+        def task():
+            try:
+                return fn()
+            finally:
+                self._slots.release()
+
+        future = pool.submit(task)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.stats['timeouts'] += 1
+            self.breaker.record_failure()
+            raise LLMTimeoutError(f"LLM call exceeded {self.timeout}s")
+        except Exception:
+            self.stats['errors'] += 1
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def call(self, key: str, fn: Callable):
+        """Runs `fn` under the guard; concurrent callers with the same `key` share one upstream call."""
+        return self.single_flight.do(key, lambda: self._run(fn))
+
+    def stream(self, fn: Callable[[], Iterable]) -> Iterator:
+        """
+        Guarded streaming call: `fn` returns an iterable that is consumed on the pool. Items are
+        yielded as they arrive; the whole stream must finish within the deadline.
+        """
+        pool = self._admit()
+        items: queue.Queue = queue.Queue()
+
+        def pump():
+            try:
+                for item in fn():
+                    items.put(('item', item))
+                items.put(('end', None))
+            except Exception as e:
+                items.put(('error', e))
+            finally:
+                self._slots.release()
+
+        pool.submit(pump)
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self.stats['timeouts'] += 1
+                    self.breaker.record_failure()
+                    raise LLMTimeoutError(f"LLM stream exceeded {self.timeout}s")
+                if kind == 'item':
+                    yield value
+                elif kind == 'end':
+                    self.breaker.record_success()
+                    return
+                else:
+                    self.stats['errors'] += 1
+                    self.breaker.record_failure()
+                    raise value
+        except GeneratorExit:
+            # The client went away mid-stream; that says nothing about upstream health.
+            self.breaker.release_trial()
+            raise
+
+    def status(self) -> Dict:
+        return dict(self.stats, breaker=self.breaker.state, coalesced=self.single_flight.coalesced,
+                    timeout=self.timeout, max_concurrency=self.max_concurrency)
@@ -0,0 +1,165 @@
+# mail_attachments.py
+
+import os
+import base64
+import smtplib
+import mimetypes
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+CRLF = b'\r\n'
+READ_CHUNK = 57 * 1024  # multiple of 57 bytes, so every chunk encodes to whole 76-character base64 lines
+# Templates put this where the sentence about the documents goes; it is filled in once the attachments are planned.
+ATTACHMENTS_NOTE = '<!--attachments-note-->'
+
+
+def plan_attachments(attachments: List[Dict], root: str, inline_max: int, total_max: int,
+                     overflow: str = 'link') -> Tuple[List[Dict], List[Dict]]:
+    """
+    Splits attachments into (attached, linked).
+    Files up to `inline_max` bytes are attached until `total_max` bytes have been used. Anything
+    beyond that is linked when `overflow` is 'link', or still attached (and later stream-encoded)
+    when it is 'stream'. Missing files are skipped.
+    """
+    attached, linked, used = [], [], 0
+    for attachment in attachments:
+        path = os.path.join(root, attachment['path'])
+        if not os.path.isfile(path):
+            continue
+        size = os.path.getsize(path)
+        entry = dict(attachment, size=size, full_path=path)
+        if size <= inline_max and used + size <= total_max:
+            used += size
+            attached.append(entry)
+        elif overflow == 'stream':
+            attached.append(entry)
+        else:
+            linked.append(entry)
+    return attached, linked
+
+
+def needs_streaming(attached: List[Dict], inline_max: int, total_max: int) -> bool:
+    return any(a['size'] > inline_max for a in attached) or sum(a['size'] for a in attached) > total_max
+
+
+def _download_url(attachment: Dict, base_url: str) -> str:
+    # Blob-backed attachments carry the public `url_path`; legacy ones are addressed by their folder.
+    url_path = attachment.get('url_path') or f'{os.path.dirname(attachment["path"])}/{attachment["filename"]}'
+    url = f'{base_url}/download/{quote(url_path)}'
+    return f'{url}?{urlencode({"field": attachment["field"]})}' if attachment.get('field') else url
+
+
+def download_links_html(linked: List[Dict], base_url: str) -> str:
+    items = ''.join(
+        f'<li><a href="{_download_url(a, base_url)}">{a["filename"]}</a> ({a["size"] / (1024 * 1024):.1f} MB)</li>'
+        for a in linked
+    )
+    return f'<hr><p><strong>Large attachments</strong> (admin login required):</p><ul>{items}</ul>'
+
+
+def attachments_note(attached: List[Dict], linked: List[Dict]) -> str:
+    """The sentence replacing ATTACHMENTS_NOTE, saying where the documents actually ended up."""
+    if attached and linked:
+        return 'Some documents are attached to this email; the larger ones are linked below.'
+    if attached:
+        return 'Attached documents are included with this email.'
+    if linked:
+        return 'The documents were too large to attach and are linked below.'
+    return ''
+
+
+def download_links_text(linked: List[Dict], base_url: str) -> str:
+    lines = [f'- {a["filename"]}: {_download_url(a, base_url)}' for a in linked]
+    return '\n\nLarge attachments (admin login required):\n' + '\n'.join(lines)
+
+
+def _address(value) -> str:
+    return formataddr(value) if isinstance(value, (tuple, list)) else value
+
+
+def _header(name: str, value: str) -> bytes:
+    return f'{name}: {Header(value, "utf-8").encode() if not value.isascii() else value}'.encode('ascii') + CRLF
+
+
+def _base64_lines(data: bytes) -> Iterator[bytes]:
+    encoded = base64.b64encode(data)
+    for i in range(0, len(encoded), 76):
+        yield encoded[i:i + 76] + CRLF
+
+
+def iter_mime_message(subject: str, sender, recipients: List, body: Optional[str], html: Optional[str],
+                      attachments: List[Dict]) -> Iterator[bytes]:
+    """
+    Yields a multipart/mixed message line by line, base64-encoding attachments straight
+    from disk so that at most one READ_CHUNK of any file is in memory at a time.
+    """
+    boundary = '=====' + make_msgid(domain='vendhan').strip('<>').replace('@', '.') + '====='
+    yield _header('From', _address(sender))
+    yield _header('To', ', '.join(_address(r) for r in recipients))
+    yield _header('Subject', subject)
+    yield _header('Date', formatdate(localtime=True))
+    yield _header('Message-ID', make_msgid())
+    yield b'MIME-Version: 1.0' + CRLF
+    yield f'Content-Type: multipart/mixed; boundary="{boundary}"'.encode() + CRLF + CRLF
+
+    for content, subtype in ((body, 'plain'), (html, 'html')):
+        if content:
+            yield f'--{boundary}'.encode() + CRLF
+            yield f'Content-Type: text/{subtype}; charset="utf-8"'.encode() + CRLF
+            yield b'Content-Transfer-Encoding: base64' + CRLF + CRLF
+            yield from _base64_lines(content.encode('utf-8'))
+
+    for attachment in attachments:
+        content_type = attachment.get('content_type') or mimetypes.guess_type(attachment['filename'])[0] or 'application/octet-stream'
+        filename = Header(attachment['filename'], 'utf-8').encode() if not attachment['filename'].isascii() else attachment['filename']
+        yield f'--{boundary}'.encode() + CRLF
+        yield f'Content-Type: {content_type}'.encode() + CRLF
+        yield b'Content-Transfer-Encoding: base64' + CRLF
+        yield f'Content-Disposition: attachment; filename="{filename}"'.encode() + CRLF + CRLF
+        with open(attachment['full_path'], 'rb') as fp:
+            while True:
+                chunk = fp.read(READ_CHUNK)
+                if not chunk:
+                    break
+                yield from _base64_lines(chunk)
+    yield f'--{boundary}--'.encode() + CRLF
+
+
+def send_streamed(host: smtplib.SMTP, sender, recipients: List, lines: Iterator[bytes]):
+    """Runs an SMTP transaction on an already-open connection, writing the DATA section as it is generated."""
+    envelope_from = sender[1] if isinstance(sender, (tuple, list)) else sender
+    host.ehlo_or_helo_if_needed()
+    code, reply = host.mail(envelope_from)
+    if code != 250:
+        host.rset()
+        raise smtplib.SMTPSenderRefused(code, reply, envelope_from)
+    accepted = 0
+    for recipient in recipients:
+        address = recipient[1] if isinstance(recipient, (tuple, list)) else recipient
+        code, reply = host.rcpt(address)
+        if code in (250, 251):
+            accepted += 1
+    if not accepted:
+        host.rset()
+        raise smtplib.SMTPRecipientsRefused({str(r): (code, reply) for r in recipients})
+    host.putcmd('data')
+    code, reply = host.getreply()
+    if code != 354:
+        host.rset()
+        raise smtplib.SMTPDataError(code, reply)
+    buffer, buffered = [], 0
+    for line in lines:
+        if line.startswith(b'.'):
+            line = b'.' + line
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= 64 * 1024:
+            host.send(b''.join(buffer))
+            buffer, buffered = [], 0
+    buffer.append(b'.' + CRLF)
+    host.send(b''.join(buffer))
+    code, reply = host.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, reply)
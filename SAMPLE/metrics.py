@@ -0,0 +1,191 @@
+# metrics.py
+
+import os
+import sys
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Histogram:
+    """Prometheus histogram: cumulative bucket counts, sum and count for each combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in sorted(self._series.items())]
+        for labelvalues, counts, total, count in snapshot:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{{{labels + "," if labels else ""}{le}}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{self.name}_sum{suffix} {total!r}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge kept elsewhere: `collect()` returns {label values: number} each time it is rendered."""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name, self.documentation, self.kind, self.labelnames, self.collect = name, documentation, kind, tuple(labelnames), collect
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labelvalues, value in sorted(self.collect().items()):
+            labels = ','.join(f'{name}="{_escape(v)}"' for name, v in zip(self.labelnames, labelvalues))
+            lines.append(f'{self.name}{{{labels}}} {value!r}' if labels else f'{self.name} {value!r}')
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics of one process, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def callback(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], collect: Callable) -> CallbackMetric:
+        """Registers a counter or gauge (`kind`) whose values are read from `collect` at scrape time."""
+        metric = CallbackMetric(name, documentation, kind, labelnames, collect)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(line for metric in self._metrics for line in metric.render()) + '\n'
+
+
+class RequestTimings:
+    """
+    Time spent by one request per component ('db', 'gemini', 'smtp', ...) and how many calls it took.
+    Thread-safe, so work the request hands to a pool can report into it too.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, count: int = 1):
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds: 'app;dur=12.3, db;dur=4.1;desc="3 calls"'."""
+        with self._lock:
+            parts = [f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]} call{"" if self.counts[name] == 1 else "s"}"'
+                     for name, seconds in self.durations.items()]
+        return ', '.join([f'app;dur={self.elapsed() * 1000:.1f}'] + parts)
+
+
+def collapse_stack(frame) -> str:
+    """'module:function;module:function;...' from the outermost call to `frame`, as flamegraph.pl expects."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler. One background thread per process records the stack of every thread that is
+    serving a request each `interval` seconds; requests slower than `threshold` seconds get their samples
+    written to `folder` as collapsed stacks ('frame;frame;frame count' lines, the input of flamegraph.pl
+    and speedscope). Sampling costs one sys._current_frames() call per tick, nothing inside the requests.
+    """
+
+    def __init__(self, folder: str, threshold: float = 1.0, interval: float = 0.005):
+        self.folder, self.threshold, self.interval = folder, threshold, interval
+        self._active: Dict[int, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.profiles_written = 0
+
+    def _ensure_thread(self):
+        # Started lazily and again after a fork: a preloaded master must not own the sampler its workers rely on.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._active, self._pid = {}, os.getpid()
+            self._thread = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stack = collapse_stack(frame)
+                        samples[stack] = samples.get(stack, 0) + 1
+
+    def start(self) -> int:
+        """Starts sampling the calling thread; returns the token to pass to `stop`."""
+        self._ensure_thread()
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = {}
+        return ident
+
+    def stop(self, ident: int, duration: float, label: str) -> Optional[str]:
+        """Stops sampling; if the request was slow, writes its stacks and returns the file path."""
+        with self._lock:
+            samples = self._active.pop(ident, None)
+        if not samples or duration < self.threshold:
+            return None
+        os.makedirs(self.folder, exist_ok=True)
+        safe_label = ''.join(c if c.isalnum() else '_' for c in label).strip('_')[:60] or 'request'
+        path = os.path.join(self.folder, f"{time.strftime('%Y%m%dT%H%M%S')}-{safe_label}-{int(duration * 1000)}ms-{os.getpid()}-{ident}.collapsed")
+        with open(path, 'w') as fp:
+            for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+                fp.write(f"{stack} {count}\n")
+        self.profiles_written += 1
+        return path
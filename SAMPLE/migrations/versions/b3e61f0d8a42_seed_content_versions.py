@@ -0,0 +1,28 @@
+"""Seed content versions for every cached model
+
+Revision ID: b3e61f0d8a42
+Revises: 5caddd26794f
+Create Date: 2026-10-18 18:12:40.117305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e61f0d8a42'
+down_revision = '5caddd26794f'
+branch_labels = None
+depends_on = None
+
+CACHED_CONTENT = ('announcement', 'jobopening', 'adminuser')
+
+
+def upgrade():
+    for name in CACHED_CONTENT:
+        op.execute(sa.text("INSERT INTO content_version (name, version) SELECT :name, 0 "
+                           "WHERE NOT EXISTS (SELECT 1 FROM content_version WHERE name = :name)").bindparams(name=name))
+
+
+def downgrade():
+    op.execute("DELETE FROM content_version WHERE name = 'adminuser'")
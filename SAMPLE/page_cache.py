@@ -0,0 +1,73 @@
+# page_cache.py
+
+import os
+import hashlib
+import threading
+from typing import Dict, List, Tuple
+
+from jinja2 import meta
+
+
+class PageCache:
+    """
+    Rendered-HTML cache for pages whose output depends only on their templates.
+    Entries are keyed by (endpoint, template, context) plus the modification times of the template
+    and every template it extends or includes, so editing any of those files renders afresh.
+    Each entry keeps the body together with a strong ETag (SHA-256 of the body).
+    """
+
+    def __init__(self, jinja_env, search_path: str):
+        self.env = jinja_env
+        self.search_path = search_path
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Tuple[Tuple, bytes, str]] = {}
+        self._deps: Dict[str, Tuple[float, List[str]]] = {}
+        self.hits = self.misses = 0
+
+    def _references(self, name: str) -> List[str]:
+        """Templates referenced by `name` ({% extends %}, {% include %}, {% import %}), re-parsed when it changes."""
+        path = os.path.join(self.search_path, name)
+        mtime = os.path.getmtime(path)
+        cached = self._deps.get(name)
+        if cached is None or cached[0] != mtime:
+            with open(path, encoding='utf-8') as fp:
+                refs = [ref for ref in meta.find_referenced_templates(self.env.parse(fp.read())) if ref]
+            cached = self._deps[name] = (mtime, refs)
+        return cached[1]
+
+    def signature(self, name: str) -> Tuple:
+        """((template, mtime), ...) for the template and everything it pulls in."""
+        seen, pending, stamps = set(), [name], []
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stamps.append((current, os.path.getmtime(os.path.join(self.search_path, current))))
+            pending.extend(self._references(current))
+        return tuple(sorted(stamps))
+
+    def get(self, endpoint: str, template: str, context: Dict, render) -> Tuple[bytes, str]:
+        """Returns (body, etag), calling `render()` only when the key or any template mtime changed."""
+        key = (endpoint, template, tuple(sorted(context.items())))
+        signature = self.signature(template)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        body = render().encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            self._entries[key] = (signature, body, etag)
+        return body, etag
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def stats(self) -> Dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
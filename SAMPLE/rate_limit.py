@@ -0,0 +1,126 @@
+# rate_limit.py
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+RULE = re.compile(r'^(ip|email|global):(\d+)/(\d*)(second|minute|hour|day)s?$')
+
+
+def parse_rules(spec: str) -> List[Tuple[str, int, float]]:
+    """'ip:5/10minute, email:3/hour' -> [('ip', 5, 600), ('email', 3, 3600)]. An empty spec disables the limit."""
+    rules = []
+    for part in filter(None, (p.strip() for p in (spec or '').split(','))):
+        m = RULE.match(part)
+        if not m:
+            raise ValueError(f"Invalid rate limit rule: {part!r}")
+        scope, capacity, multiplier, unit = m.groups()
+        rules.append((scope, int(capacity), int(multiplier or 1) * PERIODS[unit]))
+    return rules
+
+
+def refill(tokens: float, updated_at: float, now: float, capacity: int, period: float) -> float:
+    return min(float(capacity), tokens + (now - updated_at) * capacity / period)
+
+
+class MemoryRateLimiter:
+    """
+    Per-process token buckets: each key holds up to `capacity` tokens, refilled continuously at
+    capacity/period per second. Buckets idle for a whole period are full again and get dropped.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._swept_at = time.monotonic()
+
+    def hit(self, key: str, capacity: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        """Takes `cost` tokens from the bucket. Returns (allowed, seconds until enough tokens are available)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, period))
+            tokens = refill(tokens, updated_at, now, capacity, period)
+            allowed = tokens >= cost
+            if allowed: tokens -= cost
+            self._buckets[key] = (tokens, now, period)
+            if now - self._swept_at > self._sweep_interval:
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < v[2]}
+                self._swept_at = now
+        return allowed, 0.0 if allowed else (cost - tokens) * period / capacity
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteRateLimiter(MemoryRateLimiter):
+    """
+    Token buckets in a SQLite file shared by every worker on the host. Each hit is one short
+    BEGIN IMMEDIATE transaction; if the file cannot be used the request is let through (fail open).
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str, sweep_interval: float = 60.0):
+        self.path = path
+        self._local = threading.local()
+        self._sweep_interval = sweep_interval
+        self._swept_at = time.time()
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                         'updated_at REAL NOT NULL, expires_at REAL NOT NULL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections opened before a fork (e.g. by a preloaded app) must not be reused in the child.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key: str, capacity: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT tokens, updated_at FROM rate_limit_bucket WHERE key = ?', (key,)).fetchone()
+                tokens = refill(row[0], row[1], now, capacity, period) if row else float(capacity)
+                allowed = tokens >= cost
+                if allowed: tokens -= cost
+                conn.execute('INSERT OR REPLACE INTO rate_limit_bucket (key, tokens, updated_at, expires_at) VALUES (?, ?, ?, ?)',
+                             (key, tokens, now, now + period))
+                if now - self._swept_at > self._sweep_interval:
+                    conn.execute('DELETE FROM rate_limit_bucket WHERE expires_at < ?', (now,))
+                    self._swept_at = now
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return True, 0.0
+        return allowed, 0.0 if allowed else (cost - tokens) * period / capacity
+
+    def size(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM rate_limit_bucket WHERE expires_at >= ?', (time.time(),)).fetchone()[0]
+
+
+def create_rate_limiter(backend: str, path: Optional[str] = None):
+    """Returns a limiter for 'memory' or 'sqlite', or None when rate limiting is disabled."""
+    if backend == 'memory':
+        return MemoryRateLimiter()
+    if backend == 'sqlite':
+        return SQLiteRateLimiter(path)
+    return None
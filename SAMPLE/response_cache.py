@@ -0,0 +1,121 @@
+# response_cache.py
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key(text: str) -> str:
+    """'  What  services do you OFFER?? ' and 'what services do you offer' share one cache entry."""
+    text = _PUNCTUATION.sub(' ', text.lower())
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class MemoryResponseCache:
+    """Per-process cache: LRU-bounded to `maxsize` entries, each expiring `ttl` seconds after it was stored."""
+
+    backend = 'memory'
+
+    def __init__(self, maxsize: int = 512, ttl: int = 3600):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, question: str) -> Optional[str]:
+        with self._lock:
+            value = self._cache.get(normalize_key(question))
+            if value is None: self.misses += 1
+            else: self.hits += 1
+            return value
+
+    def set(self, question: str, answer: str):
+        with self._lock:
+            self._cache[normalize_key(question)] = answer
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._cache)
+            self._cache.clear()
+            return count
+
+    def size(self) -> int:
+        with self._lock:
+            self._cache.expire()
+            return len(self._cache)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {'backend': self.backend, 'size': self.size(), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                'hits': self.hits, 'misses': self.misses, 'hit_rate': round(self.hits / total, 3) if total else 0.0}
+
+
+class SQLiteResponseCache(MemoryResponseCache):
+    """
+    Cache kept in a SQLite file so every gunicorn worker on the host shares answers.
+    Entries expire after `ttl` seconds; beyond `maxsize` the least recently read ones are evicted.
+    Hit/miss counters are per process.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str, maxsize: int = 512, ttl: int = 3600):
+        self.path, self.maxsize, self.ttl = path, maxsize, ttl
+        self._local = threading.local()
+        self.hits = self.misses = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS response_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                         'created_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections opened before a fork (e.g. by a preloaded, warmed-up app) must not be reused in the child.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, question: str) -> Optional[str]:
+        key, now = normalize_key(question), time.time()
+        conn = self._connect()
+        row = conn.execute('SELECT value FROM response_cache WHERE key = ? AND created_at > ?', (key, now - self.ttl)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        conn.execute('UPDATE response_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return row[0]
+
+    def set(self, question: str, answer: str):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO response_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                     (normalize_key(question), answer, now, now))
+        conn.execute('DELETE FROM response_cache WHERE created_at <= ?', (now - self.ttl,))
+        conn.execute('DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                     (self.maxsize,))
+
+    def clear(self) -> int:
+        return self._connect().execute('DELETE FROM response_cache').rowcount
+
+    def size(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM response_cache WHERE created_at > ?', (time.time() - self.ttl,)).fetchone()[0]
+
+
+def create_response_cache(backend: str, maxsize: int = 512, ttl: int = 3600, path: Optional[str] = None):
+    """Returns a cache for the given backend name ('memory', 'sqlite'), or None when caching is disabled."""
+    if backend == 'memory':
+        return MemoryResponseCache(maxsize, ttl)
+    if backend == 'sqlite':
+        return SQLiteResponseCache(path, maxsize, ttl)
+    return None
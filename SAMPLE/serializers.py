@@ -0,0 +1,56 @@
+# serializers.py
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence
+
+
+def format_minutes(value: datetime) -> str:
+    """Same text as strftime('%Y-%m-%d %H:%M'), naive or aware, without parsing a format string."""
+    return value.isoformat(' ')[:16]
+
+
+def format_day(value: datetime) -> str:
+    """Same text as strftime('%Y-%m-%d')."""
+    return value.isoformat()[:10]
+
+
+def _is_datetime(column_type) -> bool:
+    try:
+        return issubclass(column_type.python_type, datetime)
+    except NotImplementedError:
+        return False
+
+
+class RowSerializer:
+    """
+    JSON serializer compiled once per table. Columns are projected in a fixed order, so callers select
+    them as plain row tuples (`db.select(*serializer.columns)`) instead of loading ORM objects, and
+    `dump` only zips names with values and runs the datetime formatters chosen at build time.
+    """
+
+    def __init__(self, table, minute_columns: Iterable[str] = ()):
+        minute_columns = set(minute_columns)
+        self.columns = list(table.columns)
+        self.names = tuple(c.name for c in self.columns)
+        self.formatters = [(index, format_minutes if column.name in minute_columns else format_day)
+                           for index, column in enumerate(self.columns) if _is_datetime(column.type)]
+
+    def dump(self, row: Sequence) -> Dict:
+        if self.formatters:
+            row = list(row)
+            for index, fmt in self.formatters:
+                if row[index] is not None: row[index] = fmt(row[index])
+        return dict(zip(self.names, row))
+
+    def dump_all(self, rows: Iterable[Sequence]) -> List[Dict]:
+        dump = self.dump
+        return [dump(row) for row in rows]
+
+    def dump_object(self, obj) -> Dict:
+        """For ORM instances already in hand (e.g. right after an insert)."""
+        return self.dump([getattr(obj, name) for name in self.names])
+
+
+def build_serializers(models: Iterable, minute_columns: Iterable[str] = ()) -> Dict[type, RowSerializer]:
+    """{model: RowSerializer}; datetimes in `minute_columns` are rendered to the minute, the others to the day."""
+    return {model: RowSerializer(model.__table__, minute_columns) for model in models}
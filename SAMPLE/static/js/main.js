@@ -371,22 +371,62 @@ document.addEventListener('DOMContentLoaded', () => {
             chatInput.value = '';
             sendBtn.disabled = true;
             addMessage('<div class="typing-indicator"><span></span><span></span><span></span></div>', 'bot');
+            const typingBubble = messagesContainer.querySelector('.typing-indicator').parentElement;
             try {
-                const response = await fetch('/api/chatbot', {
+                await streamChatReply(userMessage, typingBubble);
+            } catch (error) {
+                console.error('Chatbot error:', error);
+                typingBubble.innerHTML = "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.";
+            }
+        });
+
+        // Reads the /api/chatbot/stream Server-Sent Events and renders each delta as it arrives.
+        // Falls back to the one-shot /api/chatbot endpoint if the response is not an event stream.
+        async function streamChatReply(userMessage, bubble) {
+            const response = await fetch('/api/chatbot/stream', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json', 'Accept': 'text/event-stream'},
+                body: JSON.stringify({ message: userMessage })
+            });
+            if (response.status === 429) {
+                bubble.innerHTML = "You're sending messages too quickly. Please wait a moment and try again.";
+                return;
+            }
+            if (!response.ok || !response.body || !(response.headers.get('Content-Type') || '').includes('text/event-stream')) {
+                const fallback = await fetch('/api/chatbot', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({ message: userMessage })
                 });
-                const data = await response.json();
-                messagesContainer.querySelector('.typing-indicator').parentElement.parentElement.remove();
-                addMessage(data.response, 'bot');
-            } catch (error) {
-                console.error('Chatbot error:', error);
-                const typingIndicator = messagesContainer.querySelector('.typing-indicator');
-                if (typingIndicator) typingIndicator.parentElement.parentElement.remove();
-                addMessage("I'm sorry, I'm having trouble connecting right now. Please try again in a moment.", 'bot');
+                const data = await fallback.json();
+                bubble.innerHTML = data.response || data.error;
+                return;
             }
-        });
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '', text = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const rawEvent = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    let eventName = 'message', data = '';
+                    rawEvent.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                        else if (line.startsWith('data:')) data += line.slice(5).trim();
+                    });
+                    if (eventName === 'delta') {
+                        text += JSON.parse(data).text;
+                        bubble.innerHTML = text;
+                        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                    }
+                }
+            }
+            if (!text) bubble.innerHTML = "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.";
+        }
     }
 
     // --- LIVE UPDATES CARD FEATURE ---
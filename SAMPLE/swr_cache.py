@@ -0,0 +1,137 @@
+# swr_cache.py
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """
+    TTL cache that keeps serving an expired value for up to `stale_ttl` more seconds while one
+    background refresh replaces it. Only a cold key (never fetched, or stale for too long) makes
+    the caller wait for the upstream, and concurrent callers waiting on the same cold key share
+    one fetch. Fetch functions signal failure by raising; a failure is remembered for `error_ttl`
+    seconds, during which a cold key re-raises it without calling the upstream and a stale value
+    is served without retrying the refresh. At most `max_entries` values and as many failures are kept;
+    beyond that the oldest are evicted, which are also the first to expire since all share one TTL.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, error_ttl: float = 30.0, max_entries: int = 1000, max_workers: int = 4):
+        self.ttl, self.stale_ttl, self.error_ttl, self.max_entries = ttl, stale_ttl, error_ttl, max_entries
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._errors: Dict[Hashable, Tuple[Exception, float]] = {}
+        self._refreshing = set()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='swr-refresh')
+        self.stats = {'fresh': 0, 'stale': 0, 'miss': 0, 'coalesced': 0, 'failed_fast': 0, 'fetch_errors': 0, 'refresh_errors': 0, 'evicted': 0}
+
+    def _put(self, table: Dict, key, value):
+        # Re-inserted at the end, so dict order is store order and the first key is the oldest. Caller holds the lock.
+        table.pop(key, None)
+        table[key] = (value, time.monotonic())
+        while len(table) > self.max_entries:
+            del table[next(iter(table))]
+            self.stats['evicted'] += 1
+
+    def _store(self, key, value):
+        with self._lock:
+            self._put(self._entries, key, value)
+            self._errors.pop(key, None)
+
+    def _recent_error(self, key) -> Optional[Exception]:
+        with self._lock:
+            failure = self._errors.get(key)
+        if failure is not None and time.monotonic() - failure[1] < self.error_ttl:
+            return failure[0]
+        return None
+
+    def _refresh(self, key, fetch: Callable[[], Any]):
+        try:
+            self._store(key, fetch())
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            with self._lock:
+                self._put(self._errors, key, e)
+            logger.warning(f"Background refresh of {key!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def peek(self, key) -> Tuple[Optional[Any], str]:
+        """Returns (value, 'fresh' | 'stale' | 'miss') without fetching anything."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, 'miss'
+        value, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age < self.ttl:
+            return value, 'fresh'
+        if age < self.ttl + self.stale_ttl:
+            return value, 'stale'
+        return None, 'miss'
+
+    def cached(self, key, fetch: Callable[[], Any]) -> Tuple[Optional[Any], bool]:
+        """
+        Answers without waiting for the upstream: (value, True) for a fresh or stale entry (a stale one
+        schedules a background refresh), (None, False) for a cold key. Re-raises a recent failure of a cold key.
+        """
+        value, state = self.peek(key)
+        if state == 'fresh':
+            self.stats['fresh'] += 1
+            return value, True
+        if state == 'stale':
+            self.stats['stale'] += 1
+            if self._recent_error(key) is None:
+                with self._lock:
+                    start = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start:
+                    self._executor.submit(self._refresh, key, fetch)
+            return value, True
+        error = self._recent_error(key)
+        if error is not None:
+            self.stats['failed_fast'] += 1
+            raise error
+        return None, False
+
+    def fetch(self, key, fetch: Callable[[], Any]):
+        """Fetches a cold key inline; callers that arrive while a fetch of the same key is running wait for it."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            self.stats['coalesced'] += 1
+            return future.result()
+        self.stats['miss'] += 1
+        try:
+            value = fetch()
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            self.stats['fetch_errors'] += 1
+            with self._lock:
+                self._put(self._errors, key, e)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get(self, key, fetch: Callable[[], Any]):
+        """Returns the cached value, scheduling a background refresh when it is stale; fetches inline on a miss."""
+        value, hit = self.cached(key, fetch)
+        return value if hit else self.fetch(key, fetch)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._errors.clear()
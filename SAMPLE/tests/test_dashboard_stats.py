@@ -0,0 +1,47 @@
+# test_dashboard_stats.py
+# The DashboardStats counters kept by update_dashboard_stats must follow is_active flips, including on expired instances.
+
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+from app import app, db, Announcement, DashboardStats, JobOpening, reconcile_dashboard_stats
+
+
+@pytest.fixture
+def session():
+    with app.app_context():
+        db.create_all()
+        reconcile_dashboard_stats()
+        db.session.commit()
+        yield db.session
+        db.session.rollback()
+        db.drop_all()
+
+
+def counters(session):
+    session.expire_all()
+    stats = session.get(DashboardStats, 1)
+    return stats.active_openings, stats.active_announcements
+
+
+def test_is_active_flip_on_freshly_expired_instances_updates_the_counters(session):
+    opening = JobOpening(title='Engineer', location_type='Remote', job_type='Full-time')
+    announcement = Announcement(title='News', content='Body', category='general')
+    session.add_all([opening, announcement])
+    session.commit()
+    assert counters(session) == (1, 1)
+
+    # commit() expires both instances, so the old is_active is not loaded when they are flipped.
+    opening.is_active = False
+    announcement.is_active = False
+    session.commit()
+    assert counters(session) == (0, 0)
+
+    opening.is_active = True
+    session.commit()
+    assert counters(session) == (1, 0)
+    assert reconcile_dashboard_stats().active_openings == 1
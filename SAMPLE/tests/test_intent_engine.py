@@ -0,0 +1,30 @@
+# test_intent_engine.py
+# IntentEngine must score like the per-pattern re.search loop it replaced, including patterns that overlap.
+
+from intent_engine import IntentEngine
+
+
+def test_overlapping_regex_patterns_of_different_intents_both_match():
+    engine = IntentEngine(intents={
+        'pricing': {'patterns': [r'how much (does|is) \w+'], 'response': 'pricing'},
+        'cloud': {'patterns': [r'(is|does) cloud\w*'], 'response': 'cloud'},
+    })
+    # "is cloud hosting" sits inside pricing's match "how much is cloud"; both intents must still be found.
+    assert dict(engine.match('How much is cloud hosting?')) == {'pricing': 1.0, 'cloud': 1.0}
+
+
+def test_overlapping_keyword_and_regex_patterns_both_match():
+    engine = IntentEngine(intents={
+        'careers': {'patterns': [r'\b(apply|job)\b'], 'response': 'careers'},
+        'internship': {'patterns': [r'job\s+(for|as an?)\s+intern'], 'response': 'internship'},
+    })
+    assert dict(engine.match('Is there a job for interns?')) == {'careers': 1.0, 'internship': 1.0}
+
+
+def test_scores_count_distinct_keywords_and_ties_keep_config_order():
+    engine = IntentEngine(intents={
+        'greeting': {'patterns': [r'\b(hi|hello)\b'], 'response': 'hello'},
+        'careers': {'patterns': [r'\b(apply|job|work for you)\b'], 'response': 'careers'},
+    })
+    assert engine.match('Hi, can I apply for a job?') == [('careers', 2.0), ('greeting', 1.0)]
+    assert engine.best('hello, I want to work for you') == 'greeting'
@@ -0,0 +1,164 @@
+# test_llm_guard.py
+# LLMGuard driven by a fake Gemini model: deadlines, the circuit breaker, single-flight and the concurrency cap.
+
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from llm_guard import CircuitBreaker, CircuitOpenError, LLMBusyError, LLMGuard, LLMTimeoutError
+
+
+class FakeModel:
+    """Stands in for the Gemini model: `generate_content` waits `latency` seconds (or until `gate` is set) and may fail."""
+
+    def __init__(self, latency=0.0, fail=False, gate=None):
+        self.latency, self.fail, self.gate = latency, fail, gate
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.started.release()
+        try:
+            if self.gate is not None:
+                self.gate.wait(5)
+            time.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError("upstream error")
+            if stream:
+                return iter([SimpleNamespace(text=f"{prompt} part {i}") for i in range(3)])
+            return SimpleNamespace(text=f"answer to {prompt}")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def ask(guard, model, prompt):
+    return guard.call(prompt, lambda: model.generate_content(prompt).text)
+
+
+def test_call_returns_the_model_answer():
+    guard, model = LLMGuard(timeout=1.0), FakeModel()
+    assert ask(guard, model, 'hello') == 'answer to hello'
+    assert guard.status()['calls'] == 1 and guard.breaker.state == 'closed'
+
+
+def test_slow_call_times_out_and_counts_as_failure():
+    guard = LLMGuard(timeout=0.1, breaker=CircuitBreaker(failure_threshold=5))
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        ask(guard, FakeModel(latency=0.5), 'slow')
+    assert time.monotonic() - started < 0.4
+    assert guard.stats['timeouts'] == 1 and guard.breaker._failures == 1
+
+
+def test_breaker_opens_after_consecutive_failures_and_stops_calling_upstream():
+    guard, model = LLMGuard(timeout=1.0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)), FakeModel(fail=True)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            ask(guard, model, 'q')
+    assert guard.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        ask(guard, model, 'q')
+    assert model.calls == 2 and guard.stats['rejected_open'] == 1
+
+
+def test_half_open_trial_success_closes_the_breaker():
+    guard, model = LLMGuard(timeout=1.0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1)), FakeModel(fail=True)
+    with pytest.raises(RuntimeError):
+        ask(guard, model, 'q')
+    time.sleep(0.15)
+    assert guard.breaker.state == 'half-open'
+    model.fail = False
+    assert ask(guard, model, 'q') == 'answer to q'
+    assert guard.breaker.state == 'closed'
+
+
+def test_half_open_trial_failure_reopens_the_breaker():
+    guard, model = LLMGuard(timeout=1.0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1)), FakeModel(fail=True)
+    with pytest.raises(RuntimeError):
+        ask(guard, model, 'q')
+    time.sleep(0.15)
+    with pytest.raises(RuntimeError):
+        ask(guard, model, 'q')
+    assert guard.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        ask(guard, model, 'q')
+    assert model.calls == 2
+
+
+def test_half_open_lets_a_single_trial_through():
+    gate = threading.Event()
+    guard = LLMGuard(timeout=1.0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1))
+    with pytest.raises(RuntimeError):
+        ask(guard, FakeModel(fail=True), 'q')
+    time.sleep(0.15)
+    model = FakeModel(gate=gate)
+    trial = threading.Thread(target=ask, args=(guard, model, 'first'))
+    trial.start()
+    assert model.started.acquire(timeout=1)
+    with pytest.raises(CircuitOpenError):
+        ask(guard, model, 'second')
+    gate.set()
+    trial.join()
+    assert model.calls == 1 and guard.breaker.state == 'closed'
+
+
+def test_identical_concurrent_questions_share_one_upstream_call():
+    guard, model = LLMGuard(timeout=1.0), FakeModel(latency=0.2)
+    barrier, results = threading.Barrier(5), []
+
+    def worker():
+        barrier.wait()
+        results.append(ask(guard, model, 'same question'))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert model.calls == 1
+    assert results == ['answer to same question'] * 5
+    assert guard.status()['coalesced'] == 4
+
+
+def test_concurrency_cap_rejects_calls_beyond_the_limit():
+    gate = threading.Event()
+    guard, model = LLMGuard(timeout=0.3, max_concurrency=2), FakeModel(gate=gate)
+    outcomes = []
+
+    def worker(prompt):
+        try:
+            outcomes.append(ask(guard, model, prompt))
+        except LLMTimeoutError as e:
+            outcomes.append(type(e))
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in ('a', 'b')]
+    for t in threads: t.start()
+    for _ in threads: assert model.started.acquire(timeout=1)
+    # Both slots stay taken until the upstream calls return, even after their callers have timed out.
+    with pytest.raises(LLMBusyError):
+        ask(guard, model, 'c')
+    gate.set()
+    for t in threads: t.join()
+    assert outcomes == [LLMTimeoutError, LLMTimeoutError]
+    assert model.calls == 2 and model.max_in_flight == 2
+    assert guard.stats['rejected_busy'] == 1
+    # Being busy is not the upstream's fault: the two timeouts count, the rejection does not.
+    assert guard.breaker._failures == 2
+
+
+def test_stream_yields_parts_and_enforces_the_deadline():
+    guard = LLMGuard(timeout=1.0)
+    parts = list(guard.stream(lambda: (chunk.text for chunk in FakeModel().generate_content('q', stream=True))))
+    assert parts == ['q part 0', 'q part 1', 'q part 2']
+
+    guard = LLMGuard(timeout=0.1)
+    with pytest.raises(LLMTimeoutError):
+        list(guard.stream(lambda: FakeModel(latency=0.5).generate_content('q', stream=True)))
@@ -0,0 +1,63 @@
+# zip_stream.py
+
+import io
+import os
+import time
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable target for ZipFile; whatever was written is handed out by `drain`."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, str]], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Streams a ZIP archive of `entries` ((name in archive, path on disk)) without temp files or seeking:
+    sizes and CRCs go in data descriptors after each member, so at most one `chunk_size` read (plus its
+    compressed output) is held in memory. Missing files are skipped.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, path in entries:
+            try:
+                source = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with source:
+                info = zipfile.ZipInfo(name, date_time=time.localtime(os.fstat(source.fileno()).st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with archive.open(info, 'w') as member:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        member.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()